@@ -0,0 +1,21 @@
+import argparse
+import asyncio
+
+from app.database import AsyncSessionLocal
+from app.services.sales_rollup_service import backfill_daily_sales
+
+
+async def backfill(include_today: bool):
+    async with AsyncSessionLocal() as db:
+        rows = await backfill_daily_sales(db, include_today)
+    print(f"daily_product_sales backfilled: {rows} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="daily_product_sales özet tablosunu orders tablosundan doldurur")
+    parser.add_argument(
+        "--include-today", action="store_true",
+        help="Bugünü de yeniden hesaplar; yalnızca siparişler durdurulmuşken kullanın"
+    )
+    args = parser.parse_args()
+    asyncio.run(backfill(args.include_today))
@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.redis import REDIS_URL, get_redis
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+UNSHARED_TTL_SECONDS = float(os.getenv("PRODUCT_CACHE_UNSHARED_TTL_SECONDS", "1"))
+
+
+class TTLCache:
+    """Boyut sınırlı, TTL'li LRU cache. Hit/miss sayaçlarını tutar."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MirroredCache:
+    """
+    Process içi TTLCache ve isteğe bağlı Redis yansıması (JSON, aynı TTL ile, "prefix:key" anahtarıyla).
+    Yerel hit/miss sayaçlarını TTLCache tutar; Redis'ten bulunan değerler redis_hits'te sayılır.
+    """
+
+    def __init__(self, prefix: str, maxsize: int = 1024, ttl: float = 60.0, use_redis: bool = False):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.redis_hits = 0
+
+    def get_local(self, key: str) -> Any:
+        return self.local.get(key)
+
+    async def get_shared(self, key: str) -> Any:
+        """Redis'teki değeri döner ve yerel cache'e de koyar; Redis kapalıysa ya da hata olursa None"""
+        if not self.use_redis:
+            return None
+        try:
+            redis = await get_redis()
+            raw = await redis.get(f"{self.prefix}:{key}") if redis else None
+        except Exception as e:
+            logger.error(f"{self.prefix} cache redis lookup failed: {e}")
+            return None
+        if not raw:
+            return None
+        value = json.loads(raw)
+        self.redis_hits += 1
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any):
+        self.local.set(key, value)
+        if not self.use_redis:
+            return
+        try:
+            redis = await get_redis()
+            if redis:
+                await redis.set(f"{self.prefix}:{key}", json.dumps(value), ex=int(self.ttl))
+        except Exception as e:
+            logger.error(f"{self.prefix} cache redis write failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    def stats(self) -> dict:
+        return {**self.local.stats(), "redis_hits": self.redis_hits}
+
+
+def unshared_ttl(ttl: float, name: str) -> float:
+    """
+    Redis olmadan birden çok worker çalışıyorsa (WEB_CONCURRENCY > 1) bir worker'daki invalidation
+    diğerlerine ulaşmaz ve onlar eski veriyi TTL boyunca okur. Bu durumda TTL
+    PRODUCT_CACHE_UNSHARED_TTL_SECONDS ile sınırlanır (0 cache'i fiilen kapatır).
+    """
+    if REDIS_URL or WORKERS <= 1 or ttl <= UNSHARED_TTL_SECONDS:
+        return ttl
+    logger.warning(f"REDIS_URL is not set with {WORKERS} workers; {name} TTL capped at {UNSHARED_TTL_SECONDS}s")
+    return UNSHARED_TTL_SECONDS
@@ -4,10 +4,15 @@ import os
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from app.instrumentation import InstrumentedQueuePool, instrument_engine
+
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Her SQL'i loglamak yerine yavaş sorgular app.instrumentation tarafından loglanır
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, echo=SQL_ECHO, poolclass=InstrumentedQueuePool)
+instrument_engine(engine)
 AsyncSessionLocal = sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
 )
@@ -16,4 +21,15 @@ Base = declarative_base()
 
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def dialect_insert(db):
+    """Bağlı veritabanı için ON CONFLICT destekleyen insert() fonksiyonunu döner"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported on {dialect}")
+    return insert
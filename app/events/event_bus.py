@@ -3,6 +3,9 @@ import asyncio
 from typing import Dict, List, Callable, Any
 from enum import Enum
 import logging
+import time
+
+from app.instrumentation import event_handler_duration, event_handler_errors
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +33,7 @@ class EventBus:
             tasks = []
             for handler in self._subscribers[event_type]:
                 try:
-                    task = asyncio.create_task(handler(data))
+                    task = asyncio.create_task(self._run_handler(event_type, handler, data))
                     tasks.append(task)
                 except Exception as e:
                     logger.error(f"Error creating task for handler {handler.__name__}: {e}")
@@ -38,6 +41,18 @@ class EventBus:
             if tasks:
                 await asyncio.gather(*tasks, return_exceptions=True)
 
+    async def _run_handler(self, event_type: EventType, handler: Callable, data: Dict[str, Any]):
+        """Handler'ı çalıştırır, süresini ve hatalarını metriklere yazar"""
+        labels = {"event": event_type.value, "handler": handler.__name__}
+        started = time.perf_counter()
+        try:
+            return await handler(data)
+        except Exception:
+            event_handler_errors.inc(**labels)
+            raise
+        finally:
+            event_handler_duration.observe(time.perf_counter() - started, **labels)
+
 
 # Global event bus instance
 event_bus = EventBus()
@@ -0,0 +1,24 @@
+import argparse
+import asyncio
+import json
+
+from app.database import AsyncSessionLocal
+from app.services.product_import_service import import_products
+
+
+async def run_import(path: str, fmt: str, chunk_size: int):
+    async with AsyncSessionLocal() as db:
+        with open(path, newline="", encoding="utf-8") as f:
+            report = await import_products(db, f, fmt, chunk_size)
+    print(json.dumps(report.dict(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ürün kataloğunu CSV ya da NDJSON dosyasından içe aktarır")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    asyncio.run(run_import(args.path, fmt, args.chunk_size))
@@ -1,11 +1,25 @@
 import asyncio
-from app.database import engine, Base
+from app.database import AsyncSessionLocal, engine, Base
 from app.models import User, Product
+from app.services.sales_rollup_service import backfill_daily_sales, sales_rollup_state
 
 async def init_db():
     async with engine.begin() as conn:
         # Tabloları oluşturur
         await conn.run_sync(Base.metadata.create_all)
+        # create_all mevcut tablolara sonradan eklenen index'leri oluşturmaz
+        await conn.run_sync(create_missing_indexes)
+
+    # Özet tablo henüz orders'tan doldurulmadıysa geçmiş günler doldurulur (bugün hariç)
+    async with AsyncSessionLocal() as db:
+        if not await sales_rollup_state.is_backfilled(db):
+            await backfill_daily_sales(db)
+
+
+def create_missing_indexes(conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
 
 if __name__ == "__main__":
     asyncio.run(init_db())
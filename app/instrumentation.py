@@ -0,0 +1,220 @@
+import contextvars
+import logging
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels):
+        self._values[tuple(sorted(labels.items()))] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(labels)} {value}" for labels, value in self._values.items()]
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels):
+        self._values[tuple(sorted(labels.items()))] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+        if series is None:
+            # kova sayaçları + sum + count
+            series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._series.items():
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(labels, [('le', str(bound))])} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels, [('le', '+Inf')])} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+http_request_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route")
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+db_time_per_request = Histogram("db_time_per_request_seconds", "Time spent in SQL per HTTP request")
+db_pool_wait_per_request = Histogram(
+    "db_pool_wait_per_request_seconds", "Time spent waiting for pooled connections per HTTP request"
+)
+db_query_duration = Histogram("db_query_duration_seconds", "SQL statement execution time")
+db_pool_wait = Histogram("db_pool_wait_seconds", "Time spent waiting for a pooled connection")
+db_slow_queries = Counter("db_slow_queries_total", f"SQL statements slower than {SLOW_QUERY_MS} ms")
+event_handler_duration = Histogram("event_handler_duration_seconds", "Event bus handler execution time")
+event_handler_errors = Counter("event_handler_errors_total", "Event bus handler failures")
+
+REGISTRY = [
+    http_request_duration, http_requests_in_flight, db_queries_per_request, db_time_per_request,
+    db_pool_wait_per_request, db_query_duration, db_pool_wait, db_slow_queries, event_handler_duration, event_handler_errors,
+]
+
+
+def render_metrics(extra_lines: Iterable[str] = ()) -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    lines += list(extra_lines)
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "pool_wait")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+
+
+_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("request_stats", default=None)
+
+
+def _route_template(scope) -> str:
+    """İsteğin eşleştiği route şablonunu (ör. /products/update/{product_id}) döndürür"""
+    # include_router route'ları prefix'li path ile kaydeder. Yeni FastAPI sürümleri alt router
+    # route'larını kopyalamaz; prefix'li şablon eşleşen route bağlamında (path_format) tutulur.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path_format", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Route bazında gecikme histogramı, eşzamanlı istek sayısı ve istek başına SQL istatistikleri"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            _request_stats.reset(token)
+
+            # Yönlendirme sonrası scope'a yazılan route şablonu; eşleşmeyen yollar tek etikette toplanır
+            labels = {"method": scope["method"], "route": _route_template(scope)}
+            http_request_duration.observe(elapsed, status=str(status_code), **labels)
+            db_queries_per_request.observe(stats.queries, **labels)
+            db_time_per_request.observe(stats.db_time, **labels)
+            db_pool_wait_per_request.observe(stats.pool_wait, **labels)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Havuzdan bağlantı alırken beklenen süreyi ölçer"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            db_pool_wait.observe(elapsed)
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.pool_wait += elapsed
+
+
+def instrument_engine(engine):
+    """SQL sürelerini ölçen engine event'lerini kaydeder ve yavaş sorguları örnekleyerek loglar"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_query_duration.observe(elapsed)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            db_slow_queries.inc()
+            if random.random() < SLOW_QUERY_SAMPLE_RATE:
+                logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {' '.join(statement.split())[:1000]}")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
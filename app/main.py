@@ -2,12 +2,16 @@ import asyncio
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, status
 from starlette.middleware.cors import CORSMiddleware
 
-from app.routers import auth, users, ws, products, metrics, orders, forecast
+from app.routers import auth, users, ws, products, metrics, orders, forecast, internal
 from app.database import Base, engine
+from app.instrumentation import MetricsMiddleware
 from app.routers.ws import manager
-from app.scheduler import setup_scheduler, periodic_forecast_check
+from app.scheduler import setup_scheduler
 from app.security import verify_token
 from app.tasks import periodic_critical_stock_check
+from app.redis import REDIS_URL
+from app.services.product_cache import product_cache
+from app.services.fit_service import fit_service
 from app.events.event_bus import event_bus, EventType
 from app.handlers.notification_handlers import (
     handle_critical_stock_notification,
@@ -23,6 +27,7 @@ app.include_router(products.router, prefix="/products", tags=["products"])
 app.include_router(orders.router, prefix="/orders", tags=["orders"])
 app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 app.include_router(forecast.router, prefix="/forecast", tags=["forecast"])
+app.include_router(internal.router, prefix="/internal", tags=["internal"])
 app.include_router(ws.router)
 
 app.add_middleware(
@@ -31,7 +36,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Forecast-Computed-At"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 @app.on_event("startup")
@@ -44,9 +51,14 @@ async def startup():
     event_bus.subscribe(EventType.USER_LOGOUT, handle_user_logout_notification)
 
     asyncio.create_task(periodic_critical_stock_check())
-    asyncio.create_task(periodic_forecast_check())
+    if REDIS_URL:
+        asyncio.create_task(product_cache.listen())
     setup_scheduler()
 
+@app.on_event("shutdown")
+async def shutdown():
+    fit_service.shutdown()
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     token = websocket.query_params.get("token")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Index, BigInteger, Date, Boolean
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -14,6 +14,19 @@ class Product(Base):
     stock = Column(Integer, default=0)
     critical_stock = Column(Integer, default=10)
 
+    __table_args__ = (
+        # Sadece kritik stoktaki ürünleri içeren partial index;
+        # "stock <= critical_stock" sorguları katalog yerine sonuç boyutunda çalışır.
+        # Bedeli: predicate stock'u içerdiği için PostgreSQL'de stok UPDATE'leri HOT olamaz ve
+        # tüm index'lere yazılır (bkz. benchmarks/critical_stock_index.py yazma ölçümü)
+        Index(
+            "ix_products_critical_stock",
+            id,
+            postgresql_where=stock <= critical_stock,
+            sqlite_where=stock <= critical_stock,
+        ),
+    )
+
 class Order(Base):
     __tablename__ = "orders"
     id = Column(Integer, primary_key=True, index=True)
@@ -24,6 +37,21 @@ class Order(Base):
 
     product = relationship("Product")
 
+    __table_args__ = (
+        # /orders/list/ keyset sayfalama sırası
+        Index("ix_orders_order_date_id", "order_date", "id"),
+        Index("ix_orders_product_id_order_date", "product_id", "order_date"),
+    )
+
+class DailyProductSales(Base):
+    """Ürün başına günlük satış özeti; sipariş anında artırılır"""
+    __tablename__ = "daily_product_sales"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    qty = Column(BigInteger, nullable=False, default=0)
+    revenue = Column(BigInteger, nullable=False, default=0)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -31,3 +59,62 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     full_name = Column(String, nullable=True)
+
+
+class MetricCounter(Base):
+    """Dashboard toplamları; satır kilidi çekişmesini azaltmak için her sayaç birden çok shard'a bölünür"""
+    __tablename__ = "metric_counters"
+
+    name = Column(String, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class MaintenanceMarker(Base):
+    """Tek seferlik veri işlerinin (ör. daily_product_sales backfill'i) tamamlandığını kaydeder"""
+    __tablename__ = "maintenance_markers"
+
+    name = Column(String, primary_key=True)
+    completed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ProductClass(Base):
+    """Gece hesaplanan ABC (hacim) / XYZ (değişkenlik) sınıfı; tahmin modeli bu katmana göre seçilir"""
+    __tablename__ = "product_classes"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    abc = Column(String(1), nullable=False)
+    xyz = Column(String(1), nullable=False)
+    intermittent = Column(Boolean, nullable=False, default=False)
+    revenue = Column(BigInteger, nullable=False, default=0)
+    cv = Column(Float, nullable=True)
+    zero_share = Column(Float, nullable=False, default=1.0)
+    classified_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ForecastSweepRun(Base):
+    """Katalog tahmin taramalarının durumu ve istatistikleri; yarım kalan tarama kaldığı yerden devam eder"""
+    __tablename__ = "forecast_sweep_runs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False, default="running")
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Float, nullable=True)
+    products_per_second = Column(Float, nullable=True)
+    fit_p50_ms = Column(Float, nullable=True)
+    fit_p95_ms = Column(Float, nullable=True)
+    fit_max_ms = Column(Float, nullable=True)
+
+
+class ForecastSweepItem(Base):
+    """Bir taramada işlenmiş ürünler (checkpoint); tarama tamamlanınca silinir"""
+    __tablename__ = "forecast_sweep_items"
+
+    run_id = Column(Integer, ForeignKey("forecast_sweep_runs.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(Integer, primary_key=True)
@@ -1,9 +1,22 @@
-import aioredis
+import os
+
+from dotenv import load_dotenv
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:
+    try:
+        import aioredis
+    except Exception:  # Redis opsiyonel; yoksa get_redis None döner
+        aioredis = None
+
+load_dotenv()
+REDIS_URL = os.getenv("REDIS_URL")
 
 redis = None
 
 async def get_redis():
     global redis
-    if not redis:
-        redis = await aioredis.from_url("redis://localhost", encoding="utf8", decode_responses=True)
+    if not redis and aioredis is not None and REDIS_URL:
+        redis = aioredis.from_url(REDIS_URL, encoding="utf8", decode_responses=True)
     return redis
@@ -1,40 +1,131 @@
-from sqlalchemy import select
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import case, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Order, Product
+from app.repositories.product_repository import ProductRepository
 from app.schemas import OrderCreate
-from app.tasks import update_stock
+from app.services.metrics_service import increment_counters, order_deltas
+from app.services.product_cache import product_cache
+from app.services.response_cache import response_cache, ORDERS
+from app.services.sales_rollup_service import record_sales
+from app.tasks import publish_critical_stock_event
 
 
 class OrderRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create(self, order_create: OrderCreate):
-        product_result = await self.db.execute(
-            select(Product).where(Product.id == order_create.product_id)
-        )
-        product = product_result.scalar_one_or_none()
+    async def place(self, order_create: OrderCreate) -> tuple[Order, Product]:
+        """
+        Siparişi ve stok düşümünü tek transaction'da yapar.
+        Stok, koşullu UPDATE ile düşürüldüğü için eşzamanlı siparişler stoğu eksiye çekemez.
+        """
+        product_repo = ProductRepository(self.db)
+        product = await product_repo.decrement_stock(order_create.product_id, order_create.quantity)
 
         if not product:
-            raise ValueError("Product not found")
-
-        total = product.price * order_create.quantity
+            await self.db.rollback()
+            if not await product_repo.get(order_create.product_id):
+                raise ValueError("Product not found")
+            raise ValueError("Insufficient stock")
 
         order = Order(
             product_id=order_create.product_id,
             quantity=order_create.quantity,
-            total=total
+            total=product.price * order_create.quantity
         )
         self.db.add(order)
+        await self.db.flush()
+        await increment_counters(self.db, order_deltas([order]))
+        await record_sales(self.db, [order])
         await self.db.commit()
-        await self.db.refresh(order)
+        product_cache.invalidate(product.id)
+        response_cache.bump(ORDERS)
+
+        await publish_critical_stock_event(product, product.stock + order_create.quantity)
 
-        await update_stock(order_create.product_id, order_create.quantity)
+        return order, product
 
+    async def create(self, order_create: OrderCreate) -> Order:
+        order, _ = await self.place(order_create)
         return order
 
-    async def list(self, skip: int = 0, limit: int = 100):
+    async def create_bulk(self, order_creates: Sequence[OrderCreate]) -> tuple[list[Order | str], dict[int, Product]]:
+        """
+        Siparişleri tek transaction'da toplu olarak oluşturur.
+        Her satır için Order ya da hata mesajı, ayrıca etkilenen ürünleri döner.
+        """
+        product_ids = {order_create.product_id for order_create in order_creates}
         result = await self.db.execute(
-            select(Order).offset(skip).limit(limit)
+            select(Product).where(Product.id.in_(product_ids)).with_for_update()
+        )
+        products = {product.id: product for product in result.scalars()}
+        old_stock = {product_id: product.stock or 0 for product_id, product in products.items()}
+        available = dict(old_stock)
+
+        lines: list[int | str] = []
+        rows = []
+        for order_create in order_creates:
+            product = products.get(order_create.product_id)
+            if not product:
+                lines.append("Product not found")
+                continue
+            if available[product.id] < order_create.quantity:
+                lines.append("Insufficient stock")
+                continue
+            available[product.id] -= order_create.quantity
+            lines.append(len(rows))
+            rows.append({
+                "product_id": product.id,
+                "quantity": order_create.quantity,
+                "total": product.price * order_create.quantity,
+            })
+
+        if not rows:
+            # Stok değişmedi; rollback sonrası expire olan ürünler bildirim için döndürülmez
+            await self.db.rollback()
+            return lines, {}
+
+        decrements = {
+            product_id: old_stock[product_id] - stock
+            for product_id, stock in available.items()
+            if stock != old_stock[product_id]
+        }
+        decrement = case(decrements, value=Product.id)
+        updated = await self.db.execute(
+            update(Product)
+            .where(Product.id.in_(decrements), Product.stock >= decrement)
+            .values(stock=Product.stock - decrement)
+            .returning(Product)
+        )
+        if len(updated.scalars().all()) != len(decrements):
+            await self.db.rollback()
+            raise ValueError("Stock changed concurrently, please retry")
+
+        inserted = await self.db.execute(
+            insert(Order).returning(Order, sort_by_parameter_order=True), rows
         )
+        orders = inserted.scalars().all()
+        await increment_counters(self.db, order_deltas(orders))
+        await record_sales(self.db, orders)
+        await self.db.commit()
+        product_cache.invalidate(*decrements)
+        response_cache.bump(ORDERS)
+
+        # Eşiği geçen her ürün için tek bir event
+        for product_id in decrements:
+            await publish_critical_stock_event(products[product_id], old_stock[product_id])
+
+        return [orders[line] if isinstance(line, int) else line for line in lines], products
+
+    async def list(self, skip: int = 0, limit: int = 100, after: tuple[datetime, int] | None = None):
+        """En yeni siparişler önce; after verilirse (order_date, id) keyset sayfalama yapılır"""
+        stmt = select(Order).order_by(Order.order_date.desc(), Order.id.desc())
+        if after is not None:
+            stmt = stmt.where(tuple_(Order.order_date, Order.id) < tuple_(*after))
+        else:
+            stmt = stmt.offset(skip)
+        result = await self.db.execute(stmt.limit(limit))
         return result.scalars().all()
@@ -1,8 +1,23 @@
-from sqlalchemy import func
+import logging
+import os
+from typing import List, Sequence
+
+from sqlalchemy import Integer, String, cast, column, func, text, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
 from app.models import Product
-from app.schemas import ProductCreate, ProductUpdate
+from app.schemas import ProductCreate, ProductUpdate, ProductBatchUpdate
+from app.services.product_cache import product_cache
+
+logger = logging.getLogger(__name__)
+
+COUNT_STRATEGIES = ("exact", "cached", "estimated")
+DEFAULT_COUNT_STRATEGY = os.getenv("PRODUCT_COUNT_STRATEGY", "exact")
+if DEFAULT_COUNT_STRATEGY not in COUNT_STRATEGIES:
+    # Hatalı ayar her /metrics/ çağrısını 500'e çevirmesin
+    logger.warning(f"Unknown PRODUCT_COUNT_STRATEGY {DEFAULT_COUNT_STRATEGY!r}; falling back to 'exact'")
+    DEFAULT_COUNT_STRATEGY = "exact"
 
 class ProductRepository:
     def __init__(self, db: AsyncSession):
@@ -13,15 +28,42 @@ class ProductRepository:
         self.db.add(product)
         await self.db.commit()
         await self.db.refresh(product)
+        product_cache.invalidate(product.id)
+        product_cache.invalidate_counts()
         return product
 
     async def get(self, product_id: int) -> Product | None:
+        snapshot = product_cache.get(product_id)
+        if snapshot is not None:
+            return await self._attach(snapshot)
+
         result = await self.db.execute(select(Product).where(Product.id == product_id))
-        return result.scalars().first()
+        product = result.scalars().first()
+        if product:
+            product_cache.set(product)
+        return product
 
-    async def list(self, skip: int = 0, limit: int = 100):
-        result = await self.db.execute(select(Product).offset(skip).limit(limit))
-        return result.scalars().all()
+    async def list(self, skip: int = 0, limit: int = 100, after_id: int | None = None):
+        page_key = (skip, limit, after_id)
+        snapshots = product_cache.get_page(page_key)
+        if snapshots is not None:
+            return [await self._attach(snapshot) for snapshot in snapshots]
+
+        stmt = select(Product).order_by(Product.id)
+        if after_id is not None:
+            stmt = stmt.where(Product.id > after_id)
+        else:
+            stmt = stmt.offset(skip)
+        result = await self.db.execute(stmt.limit(limit))
+        products = result.scalars().all()
+        product_cache.set_page(page_key, products)
+        return products
+
+    async def _attach(self, snapshot: dict) -> Product:
+        """Cache'teki kolon değerlerinden, DB'ye gitmeden bu oturuma bağlı bir Product üretir"""
+        product = Product(**snapshot)
+        make_transient_to_detached(product)
+        return await self.db.merge(product, load=False)
 
     async def filter(self):
         result = await self.db.execute(select(Product).where(Product.stock <= Product.critical_stock))
@@ -34,19 +76,138 @@ class ProductRepository:
         product.stock = new_stock
         await self.db.commit()
         await self.db.refresh(product)
+        product_cache.invalidate(product_id)
         return product
 
-    async def get_critical_stock_products(self, skip: int = 0, limit: int = 100):
+    async def decrement_stock(self, product_id: int, quantity: int) -> Product | None:
+        """
+        Stoğu tek bir koşullu UPDATE ile düşürür (commit etmez).
+        Ürün yoksa ya da stok yetersizse None döner.
+        Commit'ten sonra product_cache.invalidate çağrılmalıdır.
+        """
         result = await self.db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+            .returning(Product)
+        )
+        return result.scalars().first()
+
+    async def update_many(self, updates: Sequence[ProductBatchUpdate]) -> tuple[List[Product], List[Product]]:
+        """
+        Birden çok ürün yamasını tek transaction'da uygular.
+        Güncellenen ürünleri ve bu güncellemeyle kritik seviyeye yeni düşenleri döner.
+        """
+        patches = {patch.id: patch for patch in updates}  # aynı ürün birden fazla gelirse son yama geçerli
+        result = await self.db.execute(
+            select(Product.id, Product.stock, Product.critical_stock)
+            .where(Product.id.in_(patches))
+            .with_for_update()
+        )
+        was_critical = {row.id: (row.stock or 0) <= (row.critical_stock or 0) for row in result}
+        if not was_critical:
+            await self.db.rollback()
+            return [], []
+
+        fields = ("description", "price", "stock", "critical_stock")
+        if self.db.get_bind().dialect.name == "postgresql":
+            patch_values = values(
+                column("id", Integer), column("description", String), column("price", Integer),
+                column("stock", Integer), column("critical_stock", Integer),
+                name="patch",
+            ).data([
+                (product_id, *(getattr(patches[product_id], field) for field in fields))
+                for product_id in was_critical
+            ])
+            result = await self.db.execute(
+                update(Product)
+                .where(Product.id == patch_values.c.id)
+                .values({
+                    # Tamamı NULL olan VALUES kolonları text tipinde gelir; tip açıkça verilir
+                    field: func.coalesce(cast(patch_values.c[field], getattr(Product, field).type), getattr(Product, field))
+                    for field in fields
+                })
+                .returning(Product)
+            )
+            products = result.scalars().all()
+        else:
+            # VALUES listesiyle UPDATE ... FROM desteklemeyen veritabanları için primary key ile toplu UPDATE
+            rows = [
+                {"id": product_id, **patches[product_id].dict(include=set(fields), exclude_none=True)}
+                for product_id in was_critical
+            ]
+            rows = [row for row in rows if len(row) > 1]
+            if rows:
+                await self.db.execute(update(Product), rows)
+            result = await self.db.execute(
+                select(Product).where(Product.id.in_(was_critical)).execution_options(populate_existing=True)
+            )
+            products = result.scalars().all()
+
+        await self.db.commit()
+        product_cache.invalidate(*was_critical)
+
+        newly_critical = [
+            product for product in products
+            if (product.stock or 0) <= (product.critical_stock or 0) and not was_critical[product.id]
+        ]
+        return products, newly_critical
+
+    async def get_critical_stock_products(self, skip: int = 0, limit: int = 100, after_id: int | None = None):
+        stmt = (
             select(Product)
             .where(Product.stock <= Product.critical_stock)
-            .offset(skip)
-            .limit(limit)
+            .order_by(Product.id)
         )
+        if after_id is not None:
+            stmt = stmt.where(Product.id > after_id)
+        else:
+            stmt = stmt.offset(skip)
+        result = await self.db.execute(stmt.limit(limit))
         return result.scalars().all()
 
+    async def count_critical(self) -> int:
+        result = await self.db.execute(
+            select(func.count()).select_from(Product).where(Product.stock <= Product.critical_stock)
+        )
+        return result.scalar_one()
+
     async def count(self) -> int:
         result = await self.db.execute(
             select(func.count()).select_from(Product)
         )
         return result.scalar_one()
+
+    async def count_with_strategy(self, strategy: str | None = None) -> tuple[int, bool]:
+        """
+        Toplam ürün sayısını seçilen stratejiyle döner: (sayı, tahmini_mi).
+        exact: count(*), cached: TTL'li count(*), estimated: pg_class.reltuples.
+        """
+        strategy = strategy or DEFAULT_COUNT_STRATEGY
+        if strategy not in COUNT_STRATEGIES:
+            raise ValueError(f"Unknown count strategy: {strategy}")
+
+        if strategy == "estimated":
+            estimate = await self._estimated_count()
+            if estimate is not None:
+                return estimate, True
+        elif strategy == "cached":
+            total = product_cache.counts.get("products")
+            if total is None:
+                total = await self.count()
+                product_cache.counts.set("products", total)
+            return total, False
+
+        return await self.count(), False
+
+    async def _estimated_count(self) -> int | None:
+        """Planner istatistiğinden tahmini satır sayısı; PostgreSQL dışında ya da ANALYZE yoksa None"""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return None
+        estimate = await self.db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": Product.__tablename__},
+        )
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
@@ -1,29 +1,64 @@
-from datetime import date, timedelta
-from random import  randint
-from typing import List
+import asyncio
+import json
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.services.forecast_service import forecast_product_demand
+from app.services.demand_outlook_service import MAX_OUTLOOK_HORIZON, demand_outlook_service
+from app.schemas import ForecastBatchRequest
+from app.services.forecast_service import forecast_product_demand, stream_product_forecasts
 
 router = APIRouter()
 
+
+async def _cancel_on_disconnect(request: Request, coro, poll_interval: float = 0.5):
+    """Client bağlantıyı keserse çalışan işi iptal eder (kuyruktaki fit de düşer)"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while not task.done():
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if not done and await request.is_disconnected():
+                task.cancel()
+                break
+        return await task
+    finally:
+        task.cancel()
+
 @router.get("/demand-forecast")
-async def get_demand_forecast():
-    today = date.today()
-    forecast: List[dict] = []
+async def get_demand_forecast(
+    response: Response,
+    horizon_days: int = Query(7, ge=1, le=MAX_OUTLOOK_HORIZON),
+    abc: List[Literal["A", "B", "C"]] | None = Query(None),
+    xyz: List[Literal["X", "Y", "Z"]] | None = Query(None)
+):
+    """
+    Katalog geneli günlük talep tahmini (bugünden itibaren). Scheduler tarafından önceden hesaplanır;
+    abc/xyz ile yalnızca belirli ürün sınıfları toplanabilir.
+    """
+    outlook = demand_outlook_service.latest
+    if outlook is None:
+        raise HTTPException(status_code=503, detail="Demand forecast is not ready yet")
+
+    response.headers["X-Forecast-Computed-At"] = outlook.computed_at.isoformat()
+    return outlook.select(horizon_days, abc, xyz)
 
-    for i in range(7):  # 7 günlük tahmin örneği
-        forecast.append({
-            "date": (today + timedelta(days=i)).isoformat(),
-            "predicted_demand": randint(50, 200)  # örnek veri, modelden gelecek gerçek sayı ile değiştir
-        })
+@router.post("/batch")
+async def batch_forecast(body: ForecastBatchRequest):
+    """
+    Birden çok ürün için tahminleri NDJSON olarak akıtır; her satır bir ürünün sonucudur
+    ve ürünler bittikçe (istek sırasından bağımsız) gönderilir.
+    """
+    async def lines():
+        async for result in stream_product_forecasts(body.product_ids, body.horizon_days, body.lead_time_days):
+            yield json.dumps(result) + "\n"
 
-    return forecast
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 @router.get("/{product_id}")
 async def get_forecast(
+    request: Request,
     product_id: int,
     horizon_days: int = Query(30, ge=7, le=180),
     lead_time_days: int = Query(7, ge=0, le=60),
@@ -32,6 +67,8 @@ async def get_forecast(
     """
     Belirtilen ürün için günlük talep tahmini ve yeniden sipariş önerisi döndürür.
     """
-    result = await forecast_product_demand(db, product_id, horizon_days, lead_time_days)
+    result = await _cancel_on_disconnect(
+        request, forecast_product_demand(db, product_id, horizon_days, lead_time_days)
+    )
     return result
 
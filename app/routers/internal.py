@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import engine, get_db
+from app.instrumentation import render_metrics
+from app.services.fit_service import fit_service
+from app.services.forecast_cache import forecast_cache
+from app.services.forecast_sweep_service import recent_sweeps
+from app.services.idempotency_service import idempotency_store
+from app.services.model_store import model_store
+from app.services.product_cache import product_cache
+from app.services.response_cache import response_cache
+
+router = APIRouter()
+
+
+def _cache_lines():
+    caches = {
+        "idempotency": idempotency_store.stats(),
+        "responses": response_cache.stats(),
+        "models": model_store.stats(),
+        "forecasts": forecast_cache.stats(),
+        **{f"product_{name}": stats for name, stats in product_cache.stats().items()},
+    }
+    lines = []
+    for metric in ("hits", "misses", "size"):
+        kind = "gauge" if metric == "size" else "counter"
+        name = f"cache_{metric}" if metric == "size" else f"cache_{metric}_total"
+        lines += [f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{cache="{cache}"}} {stats[metric]}' for cache, stats in caches.items()]
+    return lines
+
+
+def _pool_lines():
+    pool = engine.sync_engine.pool
+    lines = ["# TYPE db_pool_connections gauge"]
+    if hasattr(pool, "checkedout"):
+        lines.append(f'db_pool_connections{{state="checked_out"}} {pool.checkedout()}')
+        lines.append(f'db_pool_connections{{state="idle"}} {pool.checkedin()}')
+    return lines
+
+
+def _fit_lines():
+    stats = fit_service.stats()
+    return [
+        "# TYPE forecast_fits_pending gauge",
+        f"forecast_fits_pending {stats['pending']}",
+        "# TYPE forecast_fits_total counter",
+        *(f'forecast_fits_total{{outcome="{outcome}"}} {stats[outcome]}'
+          for outcome in ("completed", "rejected", "timed_out")),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def internal_metrics():
+    """Prometheus text formatında süreç metrikleri"""
+    return PlainTextResponse(
+        render_metrics(_cache_lines() + _pool_lines() + _fit_lines()),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@router.get("/forecast_sweeps")
+async def list_forecast_sweeps(limit: int = Query(20, ge=1, le=200), db: AsyncSession = Depends(get_db)):
+    """Son tahmin taramalarının durumu ve istatistikleri"""
+    return await recent_sweeps(db, limit)
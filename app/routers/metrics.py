@@ -1,31 +1,51 @@
-from fastapi import Depends, APIRouter
-from sqlalchemy import select, func
+from fastapi import Depends, APIRouter, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import Product, Order
+from app.repositories.product_repository import ProductRepository
+from app.services.idempotency_service import idempotency_store
+from app.services.metrics_service import read_counters, ORDERS_QUANTITY, ORDERS_REVENUE
+from app.services.product_cache import product_cache
+from app.services.response_cache import response_cache, PRODUCTS, ORDERS
+from app.services.sales_rollup_service import fetch_sales_history
 
 router = APIRouter()
 
 
 @router.get("/")
-async def get_overall_metrics(db: AsyncSession = Depends(get_db)):
-    critical_stock_count = await db.scalar(
-        select(func.count()).select_from(Product).where(Product.stock <= Product.critical_stock)
-    )
-    total_products_count = await db.scalar(
-        select(func.count()).select_from(Product)
-    )
-    total_orders_quantity = await db.scalar(
-        select(func.coalesce(func.sum(Order.quantity), 0))
-    )
-    total_orders_revenue = await db.scalar(
-        select(func.coalesce(func.sum(Order.total), 0))
-    )
+async def get_overall_metrics(request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        product_repo = ProductRepository(db)
+        critical_stock_count = await product_repo.count_critical()
+        total_products_count, total_products_is_estimate = await product_repo.count_with_strategy()
+        # Sipariş toplamları sipariş anında güncellenen sayaçlardan okunur
+        counters = await read_counters(db)
+        total_orders_quantity = counters.get(ORDERS_QUANTITY, 0)
+        total_orders_revenue = counters.get(ORDERS_REVENUE, 0)
 
+        return {
+            "critical_stock_count": critical_stock_count,
+            "total_products_count": total_products_count,
+            "total_products_is_estimate": total_products_is_estimate,
+            "total_orders": total_orders_quantity,
+            "total_orders_revenue":total_orders_revenue
+        }, {}
+
+    return await response_cache.respond(request, [PRODUCTS, ORDERS], build)
+
+@router.get("/sales_history")
+async def get_sales_history(
+    days: int = Query(30, ge=1, le=730),
+    product_id: int | None = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Günlük satış adedi ve cirosu (daily_product_sales özet tablosundan)"""
+    return await fetch_sales_history(db, days, product_id)
+
+@router.get("/caches")
+async def get_cache_metrics():
     return {
-        "critical_stock_count": critical_stock_count,
-        "total_products_count": total_products_count,
-        "total_orders": total_orders_quantity,
-        "total_orders_revenue":total_orders_revenue
-    }
\ No newline at end of file
+        "idempotency": idempotency_store.stats(),
+        "product_cache": product_cache.stats(),
+        "responses": response_cache.stats()
+    }
@@ -1,40 +1,125 @@
-from typing import List
+from datetime import datetime
+from typing import List, Literal
 
-from fastapi import Depends, HTTPException, APIRouter
+from fastapi import Depends, HTTPException, APIRouter, Response, Header, Query
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.models import Order
 from app.notifications import notify_critical_stock
+from app.pagination import encode_cursor, decode_cursor
 from app.repositories.order_repository import OrderRepository
-from app.repositories.product_repository import ProductRepository
 from app.routers.auth import get_current_user
-from app.schemas import OrderOut, OrderCreate
+from app.schemas import OrderOut, OrderCreate, BulkOrderLineOut
+from app.services.export_service import EXPORT_MEDIA_TYPES, orders_export_query, stream_export
+from app.services.idempotency_service import idempotency_store
+from app.services.order_coalescer import order_coalescer
 
 router = APIRouter()
 
+MAX_BULK_ORDERS = 5000
+
 @router.post("/create/", response_model=OrderOut)
 async def create_order(
     order: OrderCreate,
     db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user),
+    idempotency_key: str | None = Header(None, max_length=255)
+):
+    if not idempotency_key:
+        return await _place_order(order, db, current_user)
+
+    request_body = jsonable_encoder(order)
+
+    async def place_and_store():
+        new_order = await _place_order(order, db, current_user)
+        return {"request": request_body, "response": jsonable_encoder(OrderOut.model_validate(new_order, from_attributes=True))}
+
+    stored = await idempotency_store.run(f"{current_user.id}:{idempotency_key}", place_and_store)
+    if stored["request"] != request_body:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    return stored["response"]
+
+async def _place_order(order: OrderCreate, db: AsyncSession, current_user):
+    order_repo = OrderRepository(db)
+
+    try:
+        if order_coalescer.is_hot(order.product_id):
+            new_order, product = await order_coalescer.submit(order)
+        else:
+            new_order, product = await order_repo.place(order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    await notify_critical_stock(current_user.email, product)
+
+    return new_order
+
+@router.post("/bulk/", response_model=List[BulkOrderLineOut])
+async def create_orders_bulk(
+    orders: List[OrderCreate],
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
+    if len(orders) > MAX_BULK_ORDERS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ORDERS} orders per request")
+    if not orders:
+        return []
+
     order_repo = OrderRepository(db)
-    product_repo = ProductRepository(db)
 
     try:
-        new_order = await order_repo.create(order)
-        product = await product_repo.get(order.product_id)
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
+        lines, products = await order_repo.create_bulk(orders)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
+    for product in products.values():
         await notify_critical_stock(current_user.email, product)
 
-        return new_order
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return [
+        {"index": i, "success": True, "order": line}
+        if isinstance(line, Order) else
+        {"index": i, "success": False, "error": line}
+        for i, line in enumerate(lines)
+    ]
 
 @router.get("/list/", response_model=List[OrderOut])
-async def list_orders(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def list_orders(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db)
+):
+    after = None
+    if cursor:
+        try:
+            order_date, order_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(order_date), int(order_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     repo = OrderRepository(db)
-    return await repo.list(skip, limit)
+    orders = await repo.list(skip, limit, after=after)
 
+    if orders and len(orders) == limit:
+        last = orders[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.order_date.isoformat(), last.id)
+    return orders
+
+@router.get("/export")
+async def export_orders(
+    format: Literal["csv", "ndjson"] = "csv",
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    product_id: List[int] | None = Query(None)
+):
+    """Sipariş geçmişini sayfalama olmadan, sabit bellekle akış halinde döner"""
+    stmt = orders_export_query(start_date, end_date, product_id)
+    return StreamingResponse(
+        stream_export(stmt, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'}
+    )
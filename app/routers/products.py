@@ -1,16 +1,25 @@
-from typing import List
+import io
+from typing import List, Literal
 
-from fastapi import Depends, HTTPException, APIRouter, Response
+from fastapi import Depends, HTTPException, APIRouter, Request, UploadFile, File, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.notifications import notify_critical_stock
+from app.pagination import encode_cursor, decode_cursor
 from app.repositories.product_repository import ProductRepository
-from app.schemas import ProductUpdate, ProductCreate, ProductOut
-from app.tasks import  send_email_critical_product
+from app.schemas import ProductUpdate, ProductCreate, ProductOut, ProductBatchUpdate
+from app.services.export_service import EXPORT_MEDIA_TYPES, products_export_query, stream_export
+from app.services.product_cache import product_cache
+from app.services.product_import_service import MAX_CHUNK_SIZE, import_products
+from app.services.response_cache import response_cache, PRODUCTS
+from app.tasks import  send_email_critical_product, notify_critical_stock_batch
 
 router = APIRouter()
 
+MAX_BATCH_UPDATES = 5000
+
 @router.put("/update/{product_id}")
 async def update_product(
     product_id: int,
@@ -34,6 +43,7 @@ async def update_product(
     db.add(product)
     await db.commit()
     await db.refresh(product)
+    product_cache.invalidate(product.id)
 
     # Kullanıcıya kritik stok bildirimi (sadece bu ürün için)
     user_email = "berna@example.com"
@@ -42,6 +52,28 @@ async def update_product(
 
     return product
 
+@router.put("/batch_update/")
+async def batch_update_products(
+    updates: List[ProductBatchUpdate],
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
+    if len(updates) > MAX_BATCH_UPDATES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_UPDATES} updates per request")
+
+    repo = ProductRepository(db)
+    products, newly_critical = await repo.update_many(updates)
+
+    # Bildirimler response döndükten sonra tek batch olarak gönderilir
+    if newly_critical:
+        background_tasks.add_task(notify_critical_stock_batch, newly_critical)
+
+    updated_ids = {product.id for product in products}
+    return {
+        "data": products,
+        "not_found": sorted({update.id for update in updates} - updated_ids)
+    }
+
 @router.post("/create/", response_model=ProductOut)
 async def create_product(
     product: ProductCreate,
@@ -51,27 +83,92 @@ async def create_product(
     db_product = await repo.create(product)
     return db_product
 
+@router.post("/import/")
+async def import_products_file(
+    file: UploadFile = File(...),
+    format: Literal["csv", "ndjson"] | None = None,
+    chunk_size: int = Query(MAX_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """CSV ya da NDJSON ürün dosyasını akış halinde içe aktarır (isim üzerinden upsert)"""
+    fmt = format or ("ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv")
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        report = await import_products(db, lines, fmt, chunk_size)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    finally:
+        lines.detach()
+    return report.dict()
+
+def _cursor_to_id(cursor: str | None) -> int | None:
+    if not cursor:
+        return None
+    try:
+        (product_id,) = decode_cursor(cursor)
+        return int(product_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _next_cursor(products, limit: int) -> str | None:
+    if products and len(products) == limit:
+        return encode_cursor(products[-1].id)
+    return None
+
 @router.get("/list/")
 async def list_products(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    count_strategy: Literal["exact", "cached", "estimated"] | None = None,
     db: AsyncSession = Depends(get_db)
 ):
-    repo = ProductRepository(db)
-    products = await repo.list(skip, limit)
-    total = await repo.count()
+    after_id = _cursor_to_id(cursor)
 
-    return {
-        "data": products,
-        "total": total
-    }
+    async def build():
+        repo = ProductRepository(db)
+        products = await repo.list(skip, limit, after_id=after_id)
+        total, total_is_estimate = await repo.count_with_strategy(count_strategy)
+        return {
+            "data": products,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+            "next_cursor": _next_cursor(products, limit)
+        }, {}
 
-@router.get("/critical_stock_list/", response_model=List[ProductOut])
+    return await response_cache.respond(request, [PRODUCTS], build)
+
+# Response cache hazır Response döndüğü için şema yalnızca dokümantasyon amaçlıdır
+@router.get("/critical_stock_list/", responses={200: {"model": List[ProductOut]}})
 async def list_critical_stock_products(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db)
 ):
-    repo = ProductRepository(db)
-    products = await repo.get_critical_stock_products(skip=skip, limit=limit)
-    return products
+    after_id = _cursor_to_id(cursor)
+
+    async def build():
+        repo = ProductRepository(db)
+        products = await repo.get_critical_stock_products(skip=skip, limit=limit, after_id=after_id)
+        next_cursor = _next_cursor(products, limit)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        return [ProductOut.model_validate(product, from_attributes=True) for product in products], headers
+
+    return await response_cache.respond(request, [PRODUCTS], build)
+
+@router.get("/export")
+async def export_products(
+    format: Literal["csv", "ndjson"] = "csv",
+    product_id: List[int] | None = Query(None),
+    critical_only: bool = False
+):
+    """Ürün kataloğunu sabit bellekle akış halinde döner"""
+    stmt = products_export_query(product_id, critical_only)
+    return StreamingResponse(
+        stream_export(stmt, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
+    )
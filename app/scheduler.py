@@ -1,47 +1,58 @@
+import os
+from datetime import datetime
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select
-from app.database import AsyncSessionLocal
-from app.services.forecast_service import forecast_product_demand, is_stock_critical
+from app.services.classification_service import refresh_product_classes
+from app.services.demand_outlook_service import refresh_demand_outlook
+from app.services.forecast_service import is_stock_critical
+from app.services.forecast_sweep_service import run_forecast_sweep
+from app.services.metrics_service import reconcile_counters
 from app.websocket_manager import manager
 
 
-# from app.ws import notify   # mevcut websocket yayın fonksiyonun varsa
-
 async def _retrain_and_alert():
-    async with AsyncSessionLocal() as db:  # projendeki factory ismi farklıysa uyarlayın
-        # Örnek: aktif ürünleri çek
-        rows = (await db.execute(text("SELECT id FROM products WHERE is_active = true"))).all()
-        product_ids = [r[0] for r in rows]
-        for pid in product_ids:
-            result = await forecast_product_demand(db, pid, horizon_days=30, lead_time_days=7)
-            # Stok-out 7 gün içinde mi?
-            so = result.get("stockout_date")
-            # notify(...)  # burada kendi yayın mekanizmana göre uyarı gönder
+    # Tüm katalog vektörel batch motoruyla tahmin edilir; SARIMAX'e dahil ürünler
+    # önceki parametrelerden başlayarak yeniden fit edilir. Stok-out 7 gün içindeyse yayınlanır.
+    await run_forecast_sweep("retrain", on_result=_broadcast_if_critical, refit=True)
 
 def setup_scheduler():
     scheduler = AsyncIOScheduler()
+    # Model katmanlarını belirleyen ABC/XYZ sınıflandırması; gece tahminlerinden önce ve startup'ta
+    scheduler.add_job(refresh_product_classes, "cron", hour=2, minute=30, next_run_time=datetime.now())
     scheduler.add_job(_retrain_and_alert, "cron", hour=3, minute=0)
+    # Dashboard'daki katalog geneli talep görünümü; endpoint yalnızca son sonucu okur
+    scheduler.add_job(
+        refresh_demand_outlook, "interval",
+        minutes=int(os.getenv("DEMAND_OUTLOOK_MINUTES", "60")),
+        next_run_time=datetime.now()
+    )
+    scheduler.add_job(
+        periodic_forecast_check, "interval",
+        minutes=int(os.getenv("FORECAST_CHECK_MINUTES", "60")),
+        next_run_time=datetime.now()
+    )
+    # Dashboard sayaçlarını gerçek toplamlarla uzlaştır (ilk çalıştırma startup'ta)
+    scheduler.add_job(
+        reconcile_counters, "interval",
+        minutes=int(os.getenv("METRICS_RECONCILE_MINUTES", "15")),
+        next_run_time=datetime.now()
+    )
     scheduler.start()
 
-async def periodic_forecast_check():
-    async with AsyncSessionLocal() as db:  # async DB session
-        # Tüm aktif ürünleri çek
-        from app.models import Product
-        result = await db.execute(select(Product).where(Product.is_active == True))
-        products = result.scalars().all()
+async def _broadcast_if_critical(forecast):
+    if is_stock_critical(forecast, threshold_days=7):
+        # WebSocket üzerinden yayınla
+        message = {
+            "type": "critical_stock_forecast",
+            "product_id": forecast["product_id"],
+            "product_name": forecast["product_name"],
+            "stockout_date": forecast["stockout_date"],
+            "recommended_order_qty": forecast["recommended_order_qty"]
+        }
+        # manager.connected_users: dict[user_email, websocket]
+        for user_email, websocket in manager.active_connections.items():
+            await manager.send_personal_message(user_email, message)
 
-        for product in products:
-            forecast = await forecast_product_demand(db, product.id, horizon_days=30, lead_time_days=7)
-            if is_stock_critical(forecast, threshold_days=7):
-                # WebSocket üzerinden yayınla
-                message = {
-                    "type": "critical_stock_forecast",
-                    "product_id": product.id,
-                    "product_name": product.name,
-                    "stockout_date": forecast["stockout_date"],
-                    "recommended_order_qty": forecast["recommended_order_qty"]
-                }
-                # manager.connected_users: dict[user_email, websocket]
-                for user_email, websocket in manager.active_connections.items():
-                    await manager.send_personal_message(user_email, message)
\ No newline at end of file
+async def periodic_forecast_check():
+    # Tükenmeye en yakın ürünler önce; süre bütçesi dolarsa kalanlar bir sonraki çalıştırmaya kalır
+    await run_forecast_sweep("check", on_result=_broadcast_if_critical)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
 from datetime import datetime
+from typing import List
 
 class ProductBase(BaseModel):
     name: str = Field(..., min_length=1)
@@ -17,6 +18,9 @@ class ProductUpdate(BaseModel):
     stock: int | None = None
     critical_stock: int | None = None
 
+class ProductBatchUpdate(ProductUpdate):
+    id: int
+
 class ProductOut(ProductBase):
     id: int
 
@@ -25,7 +29,7 @@ class ProductOut(ProductBase):
 
 class OrderCreate(BaseModel):
     product_id: int
-    quantity: int
+    quantity: int = Field(..., gt=0)
 
 class OrderOut(BaseModel):
     id: int
@@ -37,6 +41,17 @@ class OrderOut(BaseModel):
     class Config:
         orm_mode = True
 
+class BulkOrderLineOut(BaseModel):
+    index: int
+    success: bool
+    order: OrderOut | None = None
+    error: str | None = None
+
+class ForecastBatchRequest(BaseModel):
+    product_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    horizon_days: int = Field(default=30, ge=7, le=180)
+    lead_time_days: int = Field(default=7, ge=0, le=60)
+
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
@@ -0,0 +1,300 @@
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import AsyncIterator, Dict, Iterator, List
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DailyProductSales, Product
+from app.services.classification_service import SARIMAX_TIER, product_class_cache
+from app.services.fit_service import fit_service
+
+logger = logging.getLogger(__name__)
+
+SEASON = 7
+MIN_HISTORY_DAYS = 28
+HOLDOUT_DAYS = 14
+
+SEASONAL_NAIVE = "seasonal_naive[7]"
+MOVING_AVERAGE = "moving_average[7]"
+HOLT_WINTERS = "holt_winters_additive[7]"
+SHORT_HISTORY = "naive_last7_mean"
+MODELS = np.array([SEASONAL_NAIVE, MOVING_AVERAGE, HOLT_WINTERS, SHORT_HISTORY], dtype=object)
+
+# Holt-Winters düzgünleştirme parametreleri; her ürün için en iyi kombinasyon in-sample hatayla seçilir
+HW_GRID = np.array([
+    (alpha, beta, gamma)
+    for alpha in (0.1, 0.3, 0.5)
+    for beta in (0.0, 0.05)
+    for gamma in (0.05, 0.2)
+])
+
+# Sınıfından bağımsız olarak SARIMAX'le tek tek tahmin edilecek ürünler (A sınıfı zaten SARIMAX'tir)
+SARIMAX_PRODUCT_IDS = frozenset(
+    int(pid) for pid in os.getenv("FORECAST_SARIMAX_PRODUCT_IDS", "").split(",") if pid.strip()
+)
+
+
+def seasonal_naive(Y: np.ndarray, horizon: int) -> np.ndarray:
+    """Son sezonu (7 gün) ileriye tekrarlar"""
+    last = Y[:, -SEASON:]
+    return last[:, np.arange(horizon) % SEASON]
+
+
+def moving_average(Y: np.ndarray, horizon: int, window: int = SEASON) -> np.ndarray:
+    mean = Y[:, -window:].mean(axis=1)
+    return np.repeat(mean[:, None], horizon, axis=1)
+
+
+def holt_winters(Y: np.ndarray, horizon: int, grid: np.ndarray = HW_GRID) -> np.ndarray:
+    """
+    Toplamsal Holt-Winters; zaman üzerinde döngü, ürünler ve parametre grid'i üzerinde vektörel.
+    Her ürün için bir adım ileri hata kareleri toplamı en küçük olan parametreler seçilir.
+    """
+    P, D = Y.shape
+    alpha, beta, gamma = (grid[:, i, None] for i in range(3))
+
+    first, second = Y[:, :SEASON].mean(axis=1), Y[:, SEASON:2 * SEASON].mean(axis=1)
+    level = np.broadcast_to(first, (len(grid), P)).copy()
+    trend = np.broadcast_to((second - first) / SEASON, (len(grid), P)).copy()
+    season = np.broadcast_to(Y[:, :SEASON] - first[:, None], (len(grid), P, SEASON)).copy()
+    sse = np.zeros((len(grid), P))
+
+    for t in range(SEASON, D):
+        y = Y[:, t]
+        s = season[:, :, t % SEASON]
+        sse += (y - (level + trend + s)) ** 2
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, :, t % SEASON] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    rows = np.arange(P)
+    steps = np.arange(1, horizon + 1)
+    return (
+        level[best, rows][:, None]
+        + trend[best, rows][:, None] * steps
+        + season[best, rows][:, (D + steps - 1) % SEASON]
+    )
+
+
+def croston(Y: np.ndarray, horizon: int, alpha: float = 0.1) -> np.ndarray:
+    """
+    Kesikli (çoğu günü satışsız) talep için Croston (SBA düzeltmeli): satış büyüklüğü ve
+    satışlar arası süre ayrı ayrı düzgünleştirilir, günlük talep = (1 - alpha/2) * büyüklük / süre.
+    """
+    P, D = Y.shape
+    nonzero = Y > 0
+    counts = nonzero.sum(axis=1)
+    size = np.where(counts > 0, Y.sum(axis=1) / np.maximum(counts, 1), 0.0)
+    interval = np.where(counts > 0, D / np.maximum(counts, 1), 1.0)
+    since_last = np.zeros(P)
+
+    for t in range(D):
+        since_last += 1
+        sold = nonzero[:, t]
+        size = np.where(sold, size + alpha * (Y[:, t] - size), size)
+        interval = np.where(sold, interval + alpha * (since_last - interval), interval)
+        since_last = np.where(sold, 0.0, since_last)
+
+    rate = np.where(counts > 0, (1 - alpha / 2) * size / interval, 0.0)
+    return np.repeat(rate[:, None], horizon, axis=1)
+
+
+METHODS = (seasonal_naive, moving_average, holt_winters)
+
+
+def recommended_order_qty(forecast: np.ndarray, stock: np.ndarray, lead_time_days: int, safety_days: int = 7):
+    """_recommended_order_qty'nin dizi karşılığı: (tükenme günü indeksi ya da -1, önerilen sipariş, hedef gün)"""
+    cum = forecast.cumsum(axis=1)
+    over = cum > stock[:, None]
+    stockout = np.where(over.any(axis=1), over.argmax(axis=1), -1)
+
+    target_days = max(lead_time_days + safety_days, 1)
+    demand_target = forecast[:, :target_days].sum(axis=1)
+    recommended = np.rint(np.maximum(0.0, demand_target - stock)).astype(np.int64)
+    return stockout, recommended, target_days
+
+
+def forecast_matrix(Y: np.ndarray, horizon: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Satış matrisinin her satırı için (tahmin, model indeksi) üretir.
+    Her satır için yöntem, son HOLDOUT_DAYS gün üzerindeki ortalama mutlak hataya göre seçilir.
+    Geçmişi MIN_HISTORY_DAYS'ten kısa satırlar son 7 gün ortalamasını kullanır.
+    """
+    P = Y.shape[0]
+    model_idx = np.full(P, 3)
+    forecast = moving_average(Y, horizon)
+
+    active = Y.any(axis=1)
+    first_sale = np.where(active, (Y > 0).argmax(axis=1), Y.shape[1])
+    long_history = (Y.shape[1] - first_sale) >= MIN_HISTORY_DAYS
+    if Y.shape[1] >= 2 * SEASON + HOLDOUT_DAYS and long_history.any():
+        L = Y[long_history]
+        train, test = L[:, :-HOLDOUT_DAYS], L[:, -HOLDOUT_DAYS:]
+        errors = np.stack([np.abs(method(train, HOLDOUT_DAYS) - test).mean(axis=1) for method in METHODS])
+        choice = errors.argmin(axis=0)
+        candidates = np.stack([method(L, horizon) for method in METHODS])
+        forecast[long_history] = candidates[choice, np.arange(len(L))]
+        model_idx[long_history] = choice
+
+    return np.maximum(forecast, 0.0), model_idx
+
+
+def compute_batch_forecast(Y: np.ndarray, stock: np.ndarray, horizon: int, lead_time_days: int):
+    """Ürün x gün satış matrisinden tüm ürünler için tahmin ve sipariş önerisi üretir (process havuzunda çalışır)"""
+    forecast, model_idx = forecast_matrix(Y, horizon)
+    stockout, recommended, target_days = recommended_order_qty(forecast, stock, lead_time_days)
+    return forecast, model_idx, stockout, recommended, target_days
+
+
+@dataclass
+class BatchForecast:
+    product_ids: np.ndarray
+    names: List[str]
+    stock: np.ndarray
+    start: date
+    horizon_days: int
+    lead_time_days: int
+    forecast: np.ndarray
+    model_idx: np.ndarray
+    stockout: np.ndarray
+    recommended: np.ndarray
+    target_cover_days: int
+    # SARIMAX'e dahil edilen ürünlerin tek tek üretilmiş sonuçları
+    overrides: Dict[int, dict] = field(default_factory=dict)
+    # Fit süreleri (saniye): önce batch hesaplaması, ardından her SARIMAX ürünü
+    fit_seconds: List[float] = field(default_factory=list)
+
+    def results(self, include_forecast: bool = False) -> Iterator[dict]:
+        """forecast_product_demand ile aynı alanlara sahip sonuçlar"""
+        for i, product_id in enumerate(self.product_ids.tolist()):
+            if product_id in self.overrides:
+                yield {**self.overrides[product_id], "product_name": self.names[i]}
+                continue
+            stockout = int(self.stockout[i])
+            result = {
+                "product_id": product_id,
+                "product_name": self.names[i],
+                "model": MODELS[self.model_idx[i]],
+                "horizon_days": self.horizon_days,
+                "lead_time_days": self.lead_time_days,
+                "current_stock": int(self.stock[i]),
+                "stockout_date": (self.start + timedelta(days=stockout)).isoformat() if stockout >= 0 else None,
+                "target_cover_days": self.target_cover_days,
+                "recommended_order_qty": int(self.recommended[i]),
+            }
+            if include_forecast:
+                result["forecast"] = [
+                    {"date": (self.start + timedelta(days=d)).isoformat(), "demand": float(q)}
+                    for d, q in enumerate(self.forecast[i].tolist())
+                ]
+            yield result
+
+
+async def load_sales_matrix(db: AsyncSession, product_ids: np.ndarray, start: date, end: date,
+                            contiguous: bool = False) -> np.ndarray:
+    """
+    [start, end] aralığındaki günlük satışları ürün x gün matrisine yükler (eksik günler 0).
+    product_ids sıralı olmalıdır; contiguous=True ise id aralığındaki tüm ürünlerin listede
+    olduğu varsayılır ve IN yerine BETWEEN kullanılır.
+    """
+    if contiguous:
+        product_filter = DailyProductSales.product_id.between(int(product_ids[0]), int(product_ids[-1]))
+    else:
+        product_filter = DailyProductSales.product_id.in_(product_ids.tolist())
+    stmt = (
+        select(DailyProductSales.product_id, DailyProductSales.day, DailyProductSales.qty)
+        .where(product_filter, DailyProductSales.day >= start, DailyProductSales.day <= end)
+    )
+    rows = (await db.execute(stmt)).all()
+    Y = np.zeros((len(product_ids), (end - start).days + 1))
+    if rows:
+        pids, days, qtys = zip(*rows)
+        row_idx = np.searchsorted(product_ids, np.asarray(pids))
+        day_idx = (np.asarray(days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+        np.add.at(Y, (row_idx, day_idx), np.asarray(qtys, dtype="float64"))
+    return Y
+
+
+async def forecast_products(db: AsyncSession, rows, horizon_days: int = 30, lead_time_days: int = 7,
+                            history_days: int = 365, refit: bool = False,
+                            contiguous: bool = False) -> BatchForecast:
+    """
+    (id, name, stock) satırlarındaki ürünleri tek batch'te tahmin eder.
+    SARIMAX katmanındaki ürünler (A sınıfı ya da SARIMAX_PRODUCT_IDS) forecast_product_demand ile
+    ayrıca tahmin edilir; refit=True bu ürünlerin saklı modellerini yeniden fit eder.
+    """
+    # Döngüsel import'u önlemek için
+    from app.services.forecast_service import _model_tier, forecast_product_demand
+
+    rows = sorted(rows, key=lambda row: row[0])
+    # Bugün henüz bitmediği için geçmiş dünde biter (eksik gün son gözlemi aşağı çekerdi); tahmin bugünden başlar
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=history_days - 1)
+    product_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    stock = np.fromiter((row[2] or 0 for row in rows), dtype="float64", count=len(rows))
+    Y = await load_sales_matrix(db, product_ids, start, end, contiguous=contiguous)
+
+    started = time.perf_counter()
+    forecast, model_idx, stockout, recommended, target_days = await fit_service.run(
+        compute_batch_forecast, Y, stock, horizon_days, lead_time_days,
+        timeout=max(fit_service.timeout, 300)
+    )
+    batch = BatchForecast(
+        product_ids=product_ids,
+        names=[row[1] for row in rows],
+        stock=stock,
+        start=end + timedelta(days=1),
+        horizon_days=horizon_days,
+        lead_time_days=lead_time_days,
+        forecast=forecast,
+        model_idx=model_idx,
+        stockout=stockout,
+        recommended=recommended,
+        target_cover_days=target_days,
+        fit_seconds=[time.perf_counter() - started],
+    )
+
+    classes = await product_class_cache.get_many(db, batch.product_ids.tolist())
+    sarimax_ids = [
+        product_id for product_id, product_class in classes.items()
+        if _model_tier(product_id, product_class) == SARIMAX_TIER
+    ]
+    for product_id in sarimax_ids:
+        started = time.perf_counter()
+        try:
+            batch.overrides[product_id] = await forecast_product_demand(
+                db, product_id, horizon_days, lead_time_days, refit=refit
+            )
+        except Exception as e:
+            logger.error(f"SARIMAX forecast failed for product {product_id}: {e}")
+        batch.fit_seconds.append(time.perf_counter() - started)
+    return batch
+
+
+async def forecast_catalog(db: AsyncSession, horizon_days: int = 30, lead_time_days: int = 7,
+                           history_days: int = 365, chunk_size: int = 5000,
+                           refit: bool = False) -> AsyncIterator[BatchForecast]:
+    """
+    Tüm katalog için tahminleri ürün id sırasıyla chunk_size'lık partiler halinde üretir.
+    Bellek kullanımı chunk_size x history_days ile sınırlıdır.
+    """
+    after_id = 0
+    while True:
+        rows = (await db.execute(
+            select(Product.id, Product.name, Product.stock)
+            .where(Product.id > after_id)
+            .order_by(Product.id)
+            .limit(chunk_size)
+        )).all()
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        # Chunk'lar id sırasıyla alındığı için aralıktaki tüm ürünler bu chunk'tadır
+        yield await forecast_products(db, rows, horizon_days, lead_time_days, history_days, refit, contiguous=True)
@@ -0,0 +1,151 @@
+import logging
+import os
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.database import AsyncSessionLocal
+from app.models import DailyProductSales, Product, ProductClass
+
+logger = logging.getLogger(__name__)
+
+CLASSIFICATION_DAYS = int(os.getenv("CLASSIFICATION_DAYS", "90"))
+# Cironun kümülatif payı: ilk %80 A, sonraki %15 B, kalan C
+ABC_THRESHOLDS = (0.80, 0.95)
+# Günlük adetlerin değişim katsayısı eşikleri
+XYZ_THRESHOLDS = (0.5, 1.0)
+# Günlerin bu kadarından fazlası satışsızsa talep kesikli (intermittent) sayılır
+INTERMITTENT_ZERO_SHARE = 0.5
+
+SARIMAX_TIER = "sarimax"
+SMOOTHING_TIER = "smoothing"
+INTERMITTENT_TIER = "intermittent"
+NAIVE_TIER = "naive"
+
+
+def model_tier(product_class: dict | None) -> str:
+    """A sınıfı SARIMAX, B sınıfı üstel düzgünleştirme, C naive; kesikli talep her sınıfta Croston"""
+    if product_class is None:
+        return SMOOTHING_TIER
+    if product_class["intermittent"]:
+        return INTERMITTENT_TIER
+    return {"A": SARIMAX_TIER, "B": SMOOTHING_TIER}.get(product_class["abc"], NAIVE_TIER)
+
+
+def class_label(product_class: dict | None) -> str:
+    return f"{product_class['abc']}{product_class['xyz']}" if product_class else "unclassified"
+
+
+async def classify_products(db: AsyncSession) -> int:
+    """
+    Son CLASSIFICATION_DAYS günün özet satışlarından tüm ürünleri sınıflandırır ve
+    product_classes tablosunu yeniler. Ortalama/varyans satışsız günler dahil SQL'de hesaplanır.
+    """
+    days = CLASSIFICATION_DAYS
+    stats = (
+        select(
+            DailyProductSales.product_id,
+            func.sum(DailyProductSales.revenue).label("revenue"),
+            func.sum(DailyProductSales.qty).label("qty"),
+            func.sum(DailyProductSales.qty * DailyProductSales.qty).label("qty_sq"),
+            func.count().label("sale_days"),
+        )
+        .where(DailyProductSales.day >= date.today() - timedelta(days=days - 1), DailyProductSales.qty > 0)
+        .group_by(DailyProductSales.product_id)
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(Product.id, stats.c.revenue, stats.c.qty, stats.c.qty_sq, stats.c.sale_days)
+        .outerjoin(stats, stats.c.product_id == Product.id)
+        .order_by(func.coalesce(stats.c.revenue, 0).desc(), Product.id)
+    )).all()
+
+    total_revenue = sum(int(row.revenue or 0) for row in rows)
+    cumulative = 0
+    classes = []
+    for product_id, revenue, qty, qty_sq, sale_days in rows:
+        revenue, qty, qty_sq, sale_days = int(revenue or 0), int(qty or 0), int(qty_sq or 0), int(sale_days or 0)
+        # Sıralı listede ürünün cirosundan önceki kümülatif pay
+        share = cumulative / total_revenue if total_revenue else 1.0
+        cumulative += revenue
+        abc = "A" if revenue and share < ABC_THRESHOLDS[0] else "B" if revenue and share < ABC_THRESHOLDS[1] else "C"
+
+        mean = qty / days
+        variance = max(qty_sq / days - mean * mean, 0.0)
+        cv = variance ** 0.5 / mean if mean else None
+        xyz = "Z" if cv is None or cv >= XYZ_THRESHOLDS[1] else "Y" if cv >= XYZ_THRESHOLDS[0] else "X"
+        zero_share = 1 - sale_days / days
+
+        classes.append({
+            "product_id": product_id,
+            "abc": abc,
+            "xyz": xyz,
+            "intermittent": zero_share > INTERMITTENT_ZERO_SHARE,
+            "revenue": revenue,
+            "cv": cv,
+            "zero_share": zero_share,
+        })
+
+    await db.execute(delete(ProductClass))
+    if classes:
+        await db.execute(insert(ProductClass), classes)
+    await db.commit()
+    product_class_cache.clear()
+    return len(classes)
+
+
+class ProductClassCache:
+    """product_classes satırları için process içi cache; gece sınıflandırmasından sonra temizlenir"""
+
+    def __init__(self, maxsize: int = 100000, ttl: float = 3600):
+        self.items = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, db: AsyncSession, product_id: int) -> Dict | None:
+        cached = self.items.get(product_id)
+        if cached is not None:
+            # Sınıfı olmayan ürünler de (False olarak) cache'lenir
+            return cached or None
+        row = await db.get(ProductClass, product_id)
+        product_class = {
+            "abc": row.abc, "xyz": row.xyz, "intermittent": row.intermittent
+        } if row is not None else None
+        self.items.set(product_id, product_class or False)
+        return product_class
+
+    async def get_many(self, db: AsyncSession, product_ids: List[int]) -> Dict[int, Dict | None]:
+        """Cache'te olmayan ürünlerin sınıfları tek sorguyla okunur"""
+        classes, missing = {}, []
+        for product_id in product_ids:
+            cached = self.items.get(product_id)
+            if cached is None:
+                missing.append(product_id)
+            else:
+                classes[product_id] = cached or None
+        if missing:
+            rows = (await db.execute(
+                select(ProductClass.product_id, ProductClass.abc, ProductClass.xyz, ProductClass.intermittent)
+                .where(ProductClass.product_id.in_(missing))
+            )).all()
+            found = {row.product_id: {"abc": row.abc, "xyz": row.xyz, "intermittent": row.intermittent} for row in rows}
+            for product_id in missing:
+                classes[product_id] = found.get(product_id)
+                self.items.set(product_id, classes[product_id] or False)
+        return classes
+
+    def clear(self):
+        self.items.clear()
+
+
+product_class_cache = ProductClassCache(
+    ttl=float(os.getenv("PRODUCT_CLASS_CACHE_TTL_SECONDS", "3600")),
+)
+
+
+async def refresh_product_classes():
+    """Gece işi: sınıfları yeniden hesaplar"""
+    async with AsyncSessionLocal() as db:
+        count = await classify_products(db)
+    logger.info(f"Classified {count} products")
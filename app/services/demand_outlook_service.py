@@ -0,0 +1,101 @@
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models import DailyProductSales, ProductClass
+from app.services.batch_forecast_service import MODELS, forecast_matrix
+from app.services.fit_service import fit_service
+
+logger = logging.getLogger(__name__)
+
+OUTLOOK_HISTORY_DAYS = int(os.getenv("DEMAND_OUTLOOK_HISTORY_DAYS", "365"))
+MAX_OUTLOOK_HORIZON = 28
+UNCLASSIFIED = "-"
+
+Group = Tuple[str, str]
+
+
+@dataclass
+class DemandOutlook:
+    """(ABC, XYZ) grubu başına toplam talep tahmini; istekler yalnızca ilgili satırları toplar"""
+    start: date
+    groups: List[Group]
+    forecast: np.ndarray
+    models: List[str]
+    computed_at: datetime
+
+    def select(self, horizon_days: int, abc: Sequence[str] | None = None,
+               xyz: Sequence[str] | None = None) -> List[dict]:
+        rows = [
+            i for i, (group_abc, group_xyz) in enumerate(self.groups)
+            if (not abc or group_abc in abc) and (not xyz or group_xyz in xyz)
+        ]
+        totals = self.forecast[rows, :horizon_days].sum(axis=0) if rows else np.zeros(horizon_days)
+        return [
+            {"date": (self.start + timedelta(days=i)).isoformat(), "predicted_demand": int(round(value))}
+            for i, value in enumerate(totals.tolist())
+        ]
+
+
+class DemandOutlookService:
+    """
+    Katalog geneli talep görünümü. Scheduler periyodik olarak yeniden hesaplar;
+    endpoint yalnızca hafızadaki sonucu okur.
+    """
+
+    def __init__(self, history_days: int = 365):
+        self.history_days = history_days
+        self.latest: DemandOutlook | None = None
+
+    async def refresh(self) -> DemandOutlook:
+        # Bugün henüz bitmediği için geçmiş dünde biter, tahmin bugünden başlar
+        end = date.today() - timedelta(days=1)
+        start = end - timedelta(days=self.history_days - 1)
+        abc = func.coalesce(ProductClass.abc, UNCLASSIFIED)
+        xyz = func.coalesce(ProductClass.xyz, UNCLASSIFIED)
+        # Ürünler SQL'de (sınıf, gün) bazında toplanır; DB'den yalnızca grup x gün satırları gelir
+        stmt = (
+            select(abc, xyz, DailyProductSales.day, func.sum(DailyProductSales.qty))
+            .select_from(DailyProductSales)
+            .outerjoin(ProductClass, ProductClass.product_id == DailyProductSales.product_id)
+            .where(DailyProductSales.day >= start, DailyProductSales.day <= end)
+            .group_by(abc, xyz, DailyProductSales.day)
+        )
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(stmt)).all()
+
+        groups: Dict[Group, int] = {}
+        Y = np.zeros((0, self.history_days))
+        if rows:
+            group_abc, group_xyz, days, qtys = zip(*rows)
+            keys = list(zip(group_abc, group_xyz))
+            for key in sorted(set(keys)):
+                groups[key] = len(groups)
+            Y = np.zeros((len(groups), self.history_days))
+            row_idx = np.fromiter((groups[key] for key in keys), dtype=np.int64, count=len(keys))
+            day_idx = (np.asarray(days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+            np.add.at(Y, (row_idx, day_idx), np.asarray(qtys, dtype="float64"))
+
+        forecast, model_idx = await fit_service.run(forecast_matrix, Y, MAX_OUTLOOK_HORIZON)
+        self.latest = DemandOutlook(
+            start=end + timedelta(days=1),
+            groups=list(groups),
+            forecast=forecast,
+            models=[MODELS[i] for i in model_idx],
+            computed_at=datetime.utcnow(),
+        )
+        logger.info(f"Demand outlook refreshed for {len(groups)} product groups")
+        return self.latest
+
+
+demand_outlook_service = DemandOutlookService(history_days=OUTLOOK_HISTORY_DAYS)
+
+
+async def refresh_demand_outlook():
+    await demand_outlook_service.refresh()
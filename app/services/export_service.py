@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, List
+
+from sqlalchemy import Select, select
+
+from app.database import AsyncSessionLocal
+from app.models import Order, Product
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def orders_export_query(start_date: datetime | None = None, end_date: datetime | None = None,
+                        product_ids: List[int] | None = None) -> Select:
+    stmt = select(Order.id, Order.product_id, Order.quantity, Order.total, Order.order_date)
+    if start_date:
+        stmt = stmt.where(Order.order_date >= start_date)
+    if end_date:
+        stmt = stmt.where(Order.order_date < end_date)
+    if product_ids:
+        stmt = stmt.where(Order.product_id.in_(product_ids))
+    return stmt.order_by(Order.order_date, Order.id)
+
+
+def products_export_query(product_ids: List[int] | None = None, critical_only: bool = False) -> Select:
+    stmt = select(Product.id, Product.name, Product.description, Product.price, Product.stock, Product.critical_stock)
+    if product_ids:
+        stmt = stmt.where(Product.id.in_(product_ids))
+    if critical_only:
+        stmt = stmt.where(Product.stock <= Product.critical_stock)
+    return stmt.order_by(Product.id)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+async def stream_export(stmt: Select, fmt: str, batch_size: int = 2000) -> AsyncIterator[str]:
+    """
+    Sorgu sonucunu server-side cursor ile parça parça CSV/NDJSON olarak üretir.
+    ORM nesnesi oluşturulmaz; bellek kullanımı batch_size ile sınırlıdır.
+    İstek oturumu response akarken kapandığı için kendi oturumunu açar.
+    """
+    columns = [column.key for column in stmt.selected_columns]
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(columns)
+
+        async for partition in result.partitions():
+            if fmt == "csv":
+                writer.writerows(partition)
+            else:
+                for row in partition:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class FitRejected(Exception):
+    """Kuyruk dolu olduğu için fit işi kabul edilmedi"""
+
+
+class FitTimeout(Exception):
+    """Fit işi süresinde bitmedi"""
+
+
+class FitService:
+    """
+    CPU yoğun model fit işlerini event loop dışında, process havuzunda çalıştırır.
+    Havuzdaki + kuyruktaki iş sayısı sınırlıdır; sınır dolunca iş beklemeden reddedilir.
+    Bekleyen işi iptal etmek (timeout ya da client kopması) onu kuyruktan düşürür;
+    çalışmakta olan bir fit ise sonuna kadar sürer ve slotunu bitince bırakır.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, timeout: float = 20):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # fork, event loop thread'leri olan bir süreçte güvenli değil
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _release(self, _future):
+        # Done callback'i havuzun yönetim thread'inde çalışır
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, func: Callable, *args, timeout: float | None = None) -> Any:
+        """func(*args)'ı havuzda çalıştırır; kuyruk doluysa FitRejected, süre aşılırsa FitTimeout"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise FitRejected(f"Fit queue is full ({self.max_pending} pending)")
+            self._pending += 1
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise FitTimeout(f"Fit did not finish in {timeout or self.timeout}s")
+        self.completed += 1
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+fit_service = FitService(
+    max_workers=int(os.getenv("FORECAST_FIT_WORKERS", str(min(2, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("FORECAST_FIT_QUEUE", "8")),
+    timeout=float(os.getenv("FORECAST_FIT_TIMEOUT_SECONDS", "20")),
+)
@@ -0,0 +1,77 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from app.cache import MirroredCache
+
+
+class ForecastCache:
+    """
+    Tahmin sonuçları için LRU cache; anahtar verinin watermark'ını içerdiği için
+    yeni satış ya da stok değişikliği otomatik olarak yeni anahtar üretir.
+    Aynı anahtar için eşzamanlı istekler tek bir hesaplamayı bekler. Hesaplama ayrı bir
+    task'ta çalışır; bekleyenlerin hepsi vazgeçerse (ör. client koptu) iptal edilir.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600, use_redis: bool = False):
+        self._cache = MirroredCache("forecast", maxsize=maxsize, ttl=ttl, use_redis=use_redis)
+        # key -> (task, refresh); refresh istekleri cache'ten okuyabilecek bir task'a bağlanmaz
+        self._inflight: Dict[str, Tuple[asyncio.Task, bool]] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.coalesced = 0
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]], refresh: bool = False,
+                  cacheable: Callable[[Any], bool] | None = None) -> Any:
+        """
+        key için saklı sonucu döner; yoksa func'ı bir kez çalıştırır.
+        refresh=True cache'i atlar; cacheable False dönen sonuçlar saklanmaz (yine de bekleyenlere döner).
+        """
+        if not refresh:
+            stored = self._cache.get_local(key)
+            if stored is not None:
+                return stored
+
+        inflight = self._inflight.get(key)
+        if inflight is not None and (inflight[1] or not refresh):
+            task = inflight[0]
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._compute(key, func, refresh, cacheable))
+            self._inflight[key] = (task, refresh)
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget(self, key: str, task: asyncio.Task):
+        # Aynı anahtar için sonradan başlatılmış bir refresh task'ı silinmemeli
+        if self._inflight.get(key, (None,))[0] is task:
+            del self._inflight[key]
+
+    async def _compute(self, key: str, func: Callable[[], Awaitable[Any]], refresh: bool,
+                       cacheable: Callable[[Any], bool] | None) -> Any:
+        stored = None if refresh else await self._cache.get_shared(key)
+        if stored is None:
+            stored = await func()
+            if cacheable is None or cacheable(stored):
+                await self._cache.set(key, stored)
+        return stored
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "coalesced": self.coalesced}
+
+
+forecast_cache = ForecastCache(
+    maxsize=int(os.getenv("FORECAST_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("FORECAST_CACHE_TTL_SECONDS", "3600")),
+    use_redis=os.getenv("FORECAST_CACHE_REDIS", "false").lower() in ("1", "true", "yes"),
+)
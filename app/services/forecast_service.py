@@ -1,52 +1,211 @@
+import asyncio
+import logging
+import os
 from datetime import date, timedelta
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, List, Sequence
+import numpy as np
 import pandas as pd
 from statsmodels.tsa.statespace.sarimax import SARIMAX
+from sqlalchemy import Date, cast, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import Product, Order  # modellerinizi import edin
+from app.database import AsyncSessionLocal
+from app.models import DailyProductSales, Order, Product
+from app.repositories.product_repository import ProductRepository
+from app.services.batch_forecast_service import HOLT_WINTERS, SARIMAX_PRODUCT_IDS, croston, holt_winters
+from app.services.classification_service import (
+    INTERMITTENT_TIER, NAIVE_TIER, SARIMAX_TIER, SMOOTHING_TIER, class_label, model_tier, product_class_cache
+)
+from app.services.fit_service import fit_service, FitRejected, FitTimeout
+from app.services.forecast_cache import forecast_cache
+from app.services.model_store import model_store
+from app.services.sales_rollup_service import sales_rollup_state
 from sqlalchemy.future import select
 
+logger = logging.getLogger(__name__)
+
 
 class ForecastResult(Dict[str, Any]):
     pass
 
 
-async def fetch_daily_sales(db: AsyncSession, product_id: int) -> pd.Series:
-    stmt = select(Order).where(Order.product_id == product_id)
-    result = await db.execute(stmt)
-    items = result.scalars().all()
+def daily_series(days: Sequence, qtys: Sequence) -> pd.Series:
+    """
+    Sıralı (gün, adet) kolonlarından boşlukları 0 ile doldurulmuş günlük seri üretir.
+    Satır başına Python nesnesi oluşturmadan NumPy dizileri üzerinde çalışır.
+    """
+    if len(days) == 0:
+        return pd.Series(dtype="float64")
+    day_idx = np.asarray(days, dtype="datetime64[D]")
+    offsets = (day_idx - day_idx[0]).astype(np.int64)
+    values = np.zeros(offsets[-1] + 1, dtype="float64")
+    np.add.at(values, offsets, np.asarray(qtys, dtype="float64"))
+    return pd.Series(values, index=pd.date_range(day_idx[0], periods=len(values), freq="D"))
+
+
+def order_day(dialect_name: str):
+    """Order.order_date'in gün kısmı (PostgreSQL'de date_trunc, diğerlerinde date())"""
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc("day", Order.order_date), Date)
+    return func.date(Order.order_date, type_=Date)
+
+
+def daily_sales_from_orders_query(product_id: int, dialect_name: str):
+    day = order_day(dialect_name)
+    return (
+        select(day.label("day"), func.sum(Order.quantity).label("qty"))
+        .where(Order.product_id == product_id, Order.order_date.isnot(None))
+        .group_by(day)
+        .order_by(day)
+    )
+
 
-    if not items:
+async def fetch_daily_sales(db: AsyncSession, product_id: int) -> pd.Series:
+    """
+    Günlük satış serisi. Özet tablo backfill edildiyse daily_product_sales'ten okunur; öncesinde
+    özet yalnızca deploy sonrası siparişleri içerdiği için orders tablosu SQL tarafında güne göre
+    gruplanır. Her iki durumda da DB'den yalnızca (gün, adet) satırları gelir.
+    """
+    if await sales_rollup_state.is_backfilled(db):
+        stmt = (
+            select(DailyProductSales.day, DailyProductSales.qty)
+            .where(DailyProductSales.product_id == product_id)
+            .order_by(DailyProductSales.day)
+        )
+    else:
+        stmt = daily_sales_from_orders_query(product_id, db.get_bind().dialect.name)
+    rows = (await db.execute(stmt)).all()
+    if not rows:
         return pd.Series(dtype="float64")
 
-    # DataFrame oluştur
-    df = pd.DataFrame([{"day": item.created_at.date(), "qty": item.quantity} for item in items])
-    s = df.groupby("day")["qty"].sum().asfreq("D", fill_value=0)
-    return s
+    days, qtys = zip(*rows)
+    return daily_series(days, qtys)
+
+
+async def fetch_sales_watermark(db: AsyncSession, product_id: int) -> str:
+    """
+    Ürünün satış verisinin sürümü: özet tablodaki son gün ve o günün adedi
+    (PK index'inden tek satır). Backfill öncesinde ürünün son sipariş id'si kullanılır.
+    """
+    if await sales_rollup_state.is_backfilled(db):
+        row = (await db.execute(
+            select(DailyProductSales.day, DailyProductSales.qty)
+            .where(DailyProductSales.product_id == product_id)
+            .order_by(DailyProductSales.day.desc())
+            .limit(1)
+        )).first()
+        return f"{row.day.isoformat()}/{row.qty}" if row is not None else "empty"
+    last_order_id = await db.scalar(select(func.max(Order.id)).where(Order.product_id == product_id))
+    return f"order/{last_order_id or 0}"
+
+
+async def fetch_daily_sales_many(db: AsyncSession, product_ids: List[int]) -> tuple[Dict[int, pd.Series], Dict[int, str]]:
+    """
+    fetch_daily_sales ve fetch_sales_watermark'ın çok ürünlü karşılığı: tüm ürünlerin serileri
+    tek sorguyla okunur ve ürün sınırlarından NumPy ile bölünür. Backfill öncesinde orders
+    tablosu ürün ve güne göre gruplanır.
+    """
+    if await sales_rollup_state.is_backfilled(db):
+        stmt = (
+            select(DailyProductSales.product_id, DailyProductSales.day, DailyProductSales.qty)
+            .where(DailyProductSales.product_id.in_(product_ids))
+            .order_by(DailyProductSales.product_id, DailyProductSales.day)
+        )
+        series, watermarks = _split_daily_sales((await db.execute(stmt)).all())
+        for product_id in product_ids:
+            series.setdefault(product_id, pd.Series(dtype="float64"))
+            watermarks.setdefault(product_id, "empty")
+        return series, watermarks
+
+    day = order_day(db.get_bind().dialect.name)
+    stmt = (
+        select(Order.product_id, day, func.sum(Order.quantity))
+        .where(Order.product_id.in_(product_ids), Order.order_date.isnot(None))
+        .group_by(Order.product_id, day)
+        .order_by(Order.product_id, day)
+    )
+    series = _split_daily_sales((await db.execute(stmt)).all())[0]
+    last_order_ids = dict((await db.execute(
+        select(Order.product_id, func.max(Order.id))
+        .where(Order.product_id.in_(product_ids))
+        .group_by(Order.product_id)
+    )).all())
+    watermarks = {}
+    for product_id in product_ids:
+        series.setdefault(product_id, pd.Series(dtype="float64"))
+        watermarks[product_id] = f"order/{last_order_ids.get(product_id) or 0}"
+    return series, watermarks
+
+
+def _split_daily_sales(rows) -> tuple[Dict[int, pd.Series], Dict[int, str]]:
+    """(ürün, gün, adet) satırlarını ürün başına seriye ve son güne göre watermark'a çevirir"""
+    if not rows:
+        return {}, {}
+    product_ids, days, qtys = (np.asarray(column) for column in zip(*rows))
+    bounds = np.flatnonzero(np.diff(product_ids)) + 1
+    series, watermarks = {}, {}
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(product_ids)]):
+        product_id = int(product_ids[start])
+        series[product_id] = daily_series(days[start:end], qtys[start:end])
+        watermarks[product_id] = f"{days[end - 1].isoformat()}/{qtys[end - 1]}"
+    return series, watermarks
 
 
 async def fetch_current_stock(db: AsyncSession, product_id: int) -> int:
-    stmt = select(Product).where(Product.id == product_id)
-    result = await db.execute(stmt)
-    product = result.scalar_one_or_none()
-    return product.stock_quantity if product else 0
+    product = await ProductRepository(db).get(product_id)
+    return product.stock if product else 0
 
 
 def _naive_forecast(series: pd.Series, horizon: int) -> pd.Series:
     window = series.tail(min(7, len(series))).mean() if len(series) else 0
-    idx = pd.date_range(series.index.max() + pd.Timedelta(days=1), periods=horizon, freq="D")
+    # Hiç satışı olmayan ürünlerde tahmin yarından başlar
+    last_day = series.index.max() if len(series) else pd.Timestamp(date.today())
+    idx = pd.date_range(last_day + pd.Timedelta(days=1), periods=horizon, freq="D")
     return pd.Series([float(window)] * horizon, index=idx)
 
 
-def _sarimax_forecast(series: pd.Series, horizon: int) -> pd.Series:
-    model = SARIMAX(series, order=(1, 1, 1), seasonal_order=(1, 1, 1, 7),
-                    enforce_stationarity=False, enforce_invertibility=False)
-    res = model.fit(disp=False)
+SARIMAX_SPEC = "sarimax(1,1,1)(1,1,1)[7]"
+
+
+def _sarimax_model(series: pd.Series) -> SARIMAX:
+    return SARIMAX(series, order=(1, 1, 1), seasonal_order=(1, 1, 1, 7),
+                   enforce_stationarity=False, enforce_invertibility=False)
+
+
+def _clip_forecast(res, horizon: int) -> pd.Series:
     fc = res.forecast(steps=horizon)
     fc[fc < 0] = 0.0
     return fc
 
 
+def _sarimax_fit(series: pd.Series, horizon: int, start_params: np.ndarray | None = None):
+    """Tam fit; önceki parametreler verilirse optimizasyon onlardan başlar. (tahmin, parametreler) döner"""
+    res = _sarimax_model(series).fit(start_params=start_params, disp=False)
+    return _clip_forecast(res, horizon), np.asarray(res.params)
+
+
+def _sarimax_apply(series: pd.Series, horizon: int, params: np.ndarray) -> pd.Series:
+    """Kayıtlı parametrelerle yalnızca Kalman filtresi çalıştırır (optimizasyon yok)"""
+    res = _sarimax_model(series).filter(params)
+    return _clip_forecast(res, horizon)
+
+
+async def _sarimax_forecast(product_id: int, series: pd.Series, horizon: int, refit: bool) -> pd.Series:
+    """
+    Kayıtlı model varsa yeni gözlemler eklenip yalnızca tahmin üretilir.
+    Tam fit sadece model yoksa, veri watermark'tan geriye gittiyse ya da refit istendiğinde yapılır.
+    Fit'ler event loop'u bloklamasın diye process havuzunda çalışır.
+    """
+    watermark = series.index[-1].date()
+    stored = await model_store.get(product_id, SARIMAX_SPEC)
+    if stored is not None and not refit and stored["watermark"] <= watermark:
+        return await fit_service.run(_sarimax_apply, series, horizon, stored["params"])
+
+    start_params = stored["params"] if stored is not None else None
+    fc, params = await fit_service.run(_sarimax_fit, series, horizon, start_params)
+    await model_store.put(product_id, SARIMAX_SPEC, params, watermark, len(series))
+    return fc
+
+
 def _recommended_order_qty(forecast: pd.Series, current_stock: int, lead_time_days: int, safety_days: int = 7) -> Dict[
     str, Any]:
     cum = forecast.cumsum()
@@ -68,26 +227,145 @@ def _recommended_order_qty(forecast: pd.Series, current_stock: int, lead_time_da
 
 
 async def forecast_product_demand(db: AsyncSession, product_id: int, horizon_days: int = 30,
-                                  lead_time_days: int = 7) -> ForecastResult:
-    series = await fetch_daily_sales(db, product_id)
+                                  lead_time_days: int = 7, refit: bool = False) -> ForecastResult:
+    """
+    Sonuçlar (ürün, ufuk, tedarik süresi, satış watermark'ı, stok, sınıf) anahtarıyla cache'lenir;
+    aynı anahtar için eşzamanlı istekler tek bir fit'i bekler. refit=True cache'i atlayıp tazeler.
+    """
+    watermark = await fetch_sales_watermark(db, product_id)
     current_stock = await fetch_current_stock(db, product_id)
+    product_class = await product_class_cache.get(db, product_id)
+
+    async def compute():
+        # Paylaşılan hesaplama, onu başlatan isteğin oturumundan bağımsız olmalı
+        async with AsyncSessionLocal() as session:
+            series = await fetch_daily_sales(session, product_id)
+        return await _build_forecast(
+            product_id, series, current_stock, horizon_days, lead_time_days, refit, product_class
+        )
+
+    return await _cached_forecast(
+        product_id, horizon_days, lead_time_days, watermark, current_stock, product_class, compute, refit
+    )
+
+
+async def _cached_forecast(product_id: int, horizon_days: int, lead_time_days: int, watermark: str,
+                           current_stock: int, product_class: dict | None, compute, refit: bool) -> ForecastResult:
+    key = f"{product_id}:{horizon_days}:{lead_time_days}:{watermark}:{current_stock}:{class_label(product_class)}"
+    result = await forecast_cache.run(
+        key, compute, refresh=refit,
+        # Kuyruk dolu/timeout kaynaklı geçici sonuçlar cache'lenmez
+        cacheable=lambda r: not r["model"].endswith("fallback_naive")
+    )
+    return ForecastResult(result)
+
+
+async def stream_product_forecasts(product_ids: List[int], horizon_days: int = 30, lead_time_days: int = 7,
+                                   refit: bool = False) -> AsyncIterator[dict]:
+    """
+    Birden çok ürünü tahmin eder ve her ürünün sonucunu biter bitmez üretir (sıra garanti değildir).
+    Stok, sınıf ve satış geçmişleri toplu sorgularla okunur; fit'ler forecast_product_demand ile aynı
+    cache ve process havuzundan geçer. Havuzu doldurmamak için aynı anda en fazla worker sayısı kadar
+    ürün hesaplanır. Bulunamayan ya da hata veren ürünler için {"product_id", "error"} döner.
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    async with AsyncSessionLocal() as db:
+        stocks = dict((await db.execute(
+            select(Product.id, Product.stock).where(Product.id.in_(product_ids))
+        )).all())
+        found = [product_id for product_id in product_ids if product_id in stocks]
+        series, watermarks = await fetch_daily_sales_many(db, found) if found else ({}, {})
+        classes = await product_class_cache.get_many(db, found)
+
+    for product_id in product_ids:
+        if product_id not in stocks:
+            yield {"product_id": product_id, "error": "Product not found"}
+
+    semaphore = asyncio.Semaphore(fit_service.max_workers)
+
+    async def forecast_one(product_id: int) -> dict:
+        current_stock, product_class = stocks[product_id], classes[product_id]
+
+        async def compute():
+            return await _build_forecast(
+                product_id, series[product_id], current_stock, horizon_days, lead_time_days, refit, product_class
+            )
+
+        async with semaphore:
+            try:
+                return await _cached_forecast(
+                    product_id, horizon_days, lead_time_days, watermarks[product_id], current_stock,
+                    product_class, compute, refit
+                )
+            except Exception as e:
+                logger.error(f"Batch forecast failed for product {product_id}: {e}")
+                return {"product_id": product_id, "error": str(e)}
+
+    # Ucuz modeller önce sıraya girer; ilk sonuçlar SARIMAX fit'lerini beklemez
+    found.sort(key=lambda product_id: _model_tier(product_id, classes[product_id]) == SARIMAX_TIER)
+    tasks = [asyncio.ensure_future(forecast_one(product_id)) for product_id in found]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client koparsa kalan fit'ler iptal edilir
+        for task in tasks:
+            task.cancel()
+
+
+# Holt-Winters ve Croston yalnızca son 16 haftayı kullanır; backtest'te tam geçmişe göre
+# hata farkı küçük, fit süresi geçmiş uzunluğuyla doğrusal
+SMOOTHING_HISTORY_DAYS = int(os.getenv("FORECAST_SMOOTHING_HISTORY_DAYS", "112"))
+
+
+def _smoothing_forecast(series: pd.Series, horizon: int) -> pd.Series:
+    fc = holt_winters(series.to_numpy(dtype="float64")[None, -SMOOTHING_HISTORY_DAYS:], horizon)[0]
+    idx = pd.date_range(series.index.max() + pd.Timedelta(days=1), periods=horizon, freq="D")
+    return pd.Series(np.maximum(fc, 0.0), index=idx)
+
+
+def _croston_forecast(series: pd.Series, horizon: int) -> pd.Series:
+    fc = croston(series.to_numpy(dtype="float64")[None, -SMOOTHING_HISTORY_DAYS:], horizon)[0]
+    idx = pd.date_range(series.index.max() + pd.Timedelta(days=1), periods=horizon, freq="D")
+    return pd.Series(fc, index=idx)
+
+
+async def _forecast_from_series(product_id: int, series: pd.Series, horizon_days: int, refit: bool,
+                                tier: str) -> tuple[pd.Series, str]:
+    """
+    Sınıf katmanına göre model seçer: SARIMAX yalnızca A sınıfı (ya da açıkça dahil edilen) ürünlerde.
+    Naive dışındaki tüm fit'ler event loop'u bloklamasın diye process havuzunda çalışır.
+    """
+    if len(series) < 28 or tier == NAIVE_TIER:
+        return _naive_forecast(series, horizon_days), "naive_last7_mean"
+
+    try:
+        if tier == INTERMITTENT_TIER:
+            return await fit_service.run(_croston_forecast, series, horizon_days), "croston_sba"
+        if tier == SMOOTHING_TIER:
+            return await fit_service.run(_smoothing_forecast, series, horizon_days), HOLT_WINTERS
+        return await _sarimax_forecast(product_id, series, horizon_days, refit), SARIMAX_SPEC
+    except (FitRejected, FitTimeout) as e:
+        logger.warning(f"{tier} fit skipped for product {product_id}: {e}")
+        return _naive_forecast(series, horizon_days), "fallback_naive"
+    except Exception:
+        return _naive_forecast(series, horizon_days), "fallback_naive"
+
+
+def _model_tier(product_id: int, product_class: dict | None) -> str:
+    return SARIMAX_TIER if product_id in SARIMAX_PRODUCT_IDS else model_tier(product_class)
 
-    if len(series) < 28:
-        fc = _naive_forecast(series, horizon_days)
-        model_type = "naive_last7_mean"
-    else:
-        try:
-            fc = _sarimax_forecast(series, horizon_days)
-            model_type = "sarimax(1,1,1)(1,1,1)[7]"
-        except Exception:
-            fc = _naive_forecast(series, horizon_days)
-            model_type = "fallback_naive"
 
+async def _build_forecast(product_id: int, series: pd.Series, current_stock: int, horizon_days: int,
+                          lead_time_days: int, refit: bool, product_class: dict | None) -> ForecastResult:
+    tier = _model_tier(product_id, product_class)
+    fc, model_type = await _forecast_from_series(product_id, series, horizon_days, refit, tier)
     reorder = _recommended_order_qty(fc, current_stock, lead_time_days)
 
     return ForecastResult({
         "product_id": product_id,
-        "model": model_type,
+        # Sınıf etiketiyle birlikte, ör. "AX:sarimax(1,1,1)(1,1,1)[7]"
+        "model": f"{class_label(product_class)}:{model_type}",
         "horizon_days": horizon_days,
         "lead_time_days": lead_time_days,
         "current_stock": current_stock,
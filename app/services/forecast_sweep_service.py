@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, List
+
+import numpy as np
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models import DailyProductSales, ForecastSweepItem, ForecastSweepRun, Product
+from app.services.batch_forecast_service import forecast_products
+
+logger = logging.getLogger(__name__)
+
+SWEEP_CONCURRENCY = int(os.getenv("FORECAST_SWEEP_CONCURRENCY", "2"))
+SWEEP_BUDGET_SECONDS = float(os.getenv("FORECAST_SWEEP_BUDGET_SECONDS", "1800"))
+SWEEP_CHUNK_SIZE = int(os.getenv("FORECAST_SWEEP_CHUNK_SIZE", "500"))
+# Bundan eski yarım taramalar devam ettirilmez, baştan başlanır
+SWEEP_RESUME_HOURS = float(os.getenv("FORECAST_SWEEP_RESUME_HOURS", "24"))
+VELOCITY_DAYS = 28
+
+ResultHandler = Callable[[dict], Awaitable[None]]
+
+
+async def prioritized_products(db: AsyncSession):
+    """
+    Ürünleri tükenmeye en yakın olandan başlayarak sıralar: stok / son 28 günün günlük satış hızı.
+    Satışı olmayan ürünler en sona, kendi aralarında id sırasıyla kalır.
+    """
+    velocity = (
+        select(DailyProductSales.product_id, func.sum(DailyProductSales.qty).label("qty"))
+        .where(DailyProductSales.day >= date.today() - timedelta(days=VELOCITY_DAYS - 1))
+        .group_by(DailyProductSales.product_id)
+        .subquery()
+    )
+    days_of_cover = case(
+        (velocity.c.qty > 0, func.coalesce(Product.stock, 0) * float(VELOCITY_DAYS) / velocity.c.qty),
+        else_=None,
+    )
+    stmt = (
+        select(Product.id, Product.name, Product.stock)
+        .outerjoin(velocity, velocity.c.product_id == Product.id)
+        .order_by(days_of_cover.asc().nulls_last(), func.coalesce(velocity.c.qty, 0).desc(), Product.id)
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def _start_or_resume(db: AsyncSession, kind: str) -> tuple[ForecastSweepRun, set]:
+    """Aynı türün yarım kalmış (çöken ya da süresi dolan) son taraması varsa onu devam ettirir"""
+    last = (await db.execute(
+        select(ForecastSweepRun)
+        .where(ForecastSweepRun.kind == kind)
+        .order_by(ForecastSweepRun.id.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+    resumable = (
+        last is not None and last.status != "completed"
+        and last.started_at >= datetime.utcnow() - timedelta(hours=SWEEP_RESUME_HOURS)
+    )
+    if resumable:
+        done = set((await db.execute(
+            select(ForecastSweepItem.product_id).where(ForecastSweepItem.run_id == last.id)
+        )).scalars())
+        logger.info(f"Resuming {kind} forecast sweep {last.id} ({len(done)} products already done)")
+        last.status = "running"
+        last.skipped = 0
+        last.failed = 0
+        await db.commit()
+        return last, done
+
+    run = ForecastSweepRun(kind=kind, status="running")
+    db.add(run)
+    await db.commit()
+    return run, set()
+
+
+async def run_forecast_sweep(kind: str, on_result: ResultHandler | None = None, refit: bool = False,
+                             concurrency: int = SWEEP_CONCURRENCY, budget_seconds: float = SWEEP_BUDGET_SECONDS,
+                             chunk_size: int = SWEEP_CHUNK_SIZE, horizon_days: int = 30,
+                             lead_time_days: int = 7) -> ForecastSweepRun:
+    """
+    Katalogu öncelik sırasına göre chunk'lar halinde, en fazla `concurrency` chunk aynı anda
+    olacak şekilde tahmin eder. Süre bütçesi dolunca yeni chunk başlatılmaz; kalan ürünler
+    atlanmış sayılır ve bir sonraki tarama onları öncelikle ele alır.
+    İşlenen ürünler her chunk sonunda checkpoint'lenir.
+    """
+    started = time.monotonic()
+    deadline = started + budget_seconds
+    async with AsyncSessionLocal() as db:
+        run, done = await _start_or_resume(db, kind)
+        run_id = run.id
+        products = [row for row in await prioritized_products(db) if row[0] not in done]
+
+    chunks = [products[i:i + chunk_size] for i in range(0, len(products), chunk_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+    fit_seconds: List[float] = []
+    counts = {"processed": 0, "skipped": 0, "failed": 0}
+
+    async def process(chunk):
+        async with semaphore:
+            if time.monotonic() >= deadline:
+                counts["skipped"] += len(chunk)
+                return
+            try:
+                async with AsyncSessionLocal() as db:
+                    batch = await forecast_products(
+                        db, chunk, horizon_days, lead_time_days, refit=refit
+                    )
+                    if on_result is not None:
+                        for result in batch.results():
+                            await on_result(result)
+                    await db.execute(insert(ForecastSweepItem), [
+                        {"run_id": run_id, "product_id": row[0]} for row in chunk
+                    ])
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"Forecast sweep {run_id} failed for a chunk of {len(chunk)} products: {e}")
+                counts["failed"] += len(chunk)
+                return
+            fit_seconds.extend(batch.fit_seconds)
+            counts["processed"] += len(chunk)
+
+    try:
+        await asyncio.gather(*(process(chunk) for chunk in chunks))
+    finally:
+        elapsed = time.monotonic() - started
+        async with AsyncSessionLocal() as db:
+            run = await db.get(ForecastSweepRun, run_id)
+            run.total = len(done) + len(products)
+            run.processed = len(done) + counts["processed"]
+            run.skipped = counts["skipped"]
+            run.failed = counts["failed"]
+            # Tamamlanmayan taramalar (çöken süreçte "running" kalanlar dahil) sonraki çalıştırmada devam eder
+            if run.processed == run.total:
+                run.status = "completed"
+                await db.execute(delete(ForecastSweepItem).where(ForecastSweepItem.run_id == run_id))
+            elif counts["skipped"]:
+                run.status = "budget_exhausted"
+            else:
+                run.status = "incomplete"
+            run.finished_at = datetime.utcnow()
+            run.duration_seconds = elapsed
+            run.products_per_second = counts["processed"] / elapsed if elapsed else None
+            if fit_seconds:
+                fit_ms = np.asarray(fit_seconds) * 1000
+                run.fit_p50_ms, run.fit_p95_ms = (float(v) for v in np.percentile(fit_ms, [50, 95]))
+                run.fit_max_ms = float(fit_ms.max())
+            await db.commit()
+            await db.refresh(run)
+
+    logger.info(
+        f"{kind} forecast sweep {run_id} {run.status}: {counts['processed']} processed, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed in {elapsed:.1f}s"
+    )
+    return run
+
+
+async def recent_sweeps(db: AsyncSession, limit: int = 20) -> List[ForecastSweepRun]:
+    result = await db.execute(select(ForecastSweepRun).order_by(ForecastSweepRun.id.desc()).limit(limit))
+    return result.scalars().all()
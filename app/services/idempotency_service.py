@@ -0,0 +1,55 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict
+
+from app.cache import MirroredCache
+
+
+class IdempotencyStore:
+    """
+    Idempotency-Key -> saklanan cevap eşlemesi.
+    Önce process içi LRU'ya bakılır (DB'ye gidilmez); istenirse Redis'e de yansıtılır.
+    Aynı anahtarla eşzamanlı gelen istekler ilk isteğin sonucunu bekler.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400, use_redis: bool = False):
+        self._cache = MirroredCache("idempotency", maxsize=maxsize, ttl=ttl, use_redis=use_redis)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """key için saklı cevabı döner; yoksa func'ı bir kez çalıştırıp sonucunu saklar"""
+        stored = self._cache.get_local(key)
+        if stored is not None:
+            return stored
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            stored = await self._cache.get_shared(key)
+            if stored is None:
+                stored = await func()
+                await self._cache.set(key, stored)
+            future.set_result(stored)
+            return stored
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # bekleyen yoksa "never retrieved" uyarısını engeller
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "coalesced": self.coalesced}
+
+
+idempotency_store = IdempotencyStore(
+    maxsize=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+    use_redis=os.getenv("IDEMPOTENCY_REDIS", "false").lower() in ("1", "true", "yes"),
+)
@@ -0,0 +1,91 @@
+import logging
+import os
+import random
+from typing import Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models import MetricCounter, Order
+from app.services.response_cache import response_cache, ORDERS
+
+logger = logging.getLogger(__name__)
+
+COUNTER_SHARDS = int(os.getenv("METRIC_COUNTER_SHARDS", "16"))
+
+ORDERS_COUNT = "orders_count"
+ORDERS_QUANTITY = "orders_quantity"
+ORDERS_REVENUE = "orders_revenue"
+
+
+def order_deltas(orders) -> Dict[str, int]:
+    return {
+        ORDERS_COUNT: len(orders),
+        ORDERS_QUANTITY: sum(order.quantity for order in orders),
+        ORDERS_REVENUE: sum(order.total for order in orders),
+    }
+
+
+async def increment_counters(db: AsyncSession, deltas: Dict[str, int]):
+    """
+    Sayaçları çağıranın transaction'ı içinde artırır (commit etmez).
+    Rastgele bir shard seçilir; isimler sıralı yazıldığı için kilit sırası sabittir.
+    """
+    deltas = {name: delta for name, delta in sorted(deltas.items()) if delta}
+    if not deltas:
+        return
+
+    shard = random.randrange(COUNTER_SHARDS)
+    insert = dialect_insert(db)
+    stmt = insert(MetricCounter).values([
+        {"name": name, "shard": shard, "value": delta} for name, delta in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MetricCounter.name, MetricCounter.shard],
+        set_={"value": MetricCounter.value + stmt.excluded.value},
+    )
+    await db.execute(stmt)
+
+
+async def read_counters(db: AsyncSession) -> Dict[str, int]:
+    result = await db.execute(
+        select(MetricCounter.name, func.sum(MetricCounter.value)).group_by(MetricCounter.name)
+    )
+    return {name: int(value) for name, value in result.all()}
+
+
+async def reconcile_counters():
+    """
+    Sayaçları gerçek toplamlarla karşılaştırır ve farkı ekler.
+    Gerçek toplamlar ve sayaçlar tek sorguda (aynı snapshot'ta) okunur; fark ekleme şeklinde
+    uygulandığı için bu sırada gelen siparişlerin artışları kaybolmaz.
+    """
+    def counter_sum(name: str):
+        return (
+            select(func.coalesce(func.sum(MetricCounter.value), 0))
+            .where(MetricCounter.name == name)
+            .scalar_subquery()
+        )
+
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(select(
+            select(func.count(Order.id)).scalar_subquery(),
+            select(func.coalesce(func.sum(Order.quantity), 0)).scalar_subquery(),
+            select(func.coalesce(func.sum(Order.total), 0)).scalar_subquery(),
+            counter_sum(ORDERS_COUNT),
+            counter_sum(ORDERS_QUANTITY),
+            counter_sum(ORDERS_REVENUE),
+        ))).one()
+
+        drift = {
+            ORDERS_COUNT: int(row[0]) - int(row[3]),
+            ORDERS_QUANTITY: int(row[1]) - int(row[4]),
+            ORDERS_REVENUE: int(row[2]) - int(row[5]),
+        }
+        if any(drift.values()):
+            logger.warning(f"Metric counters drifted, correcting: {drift}")
+            await increment_counters(db, drift)
+            await db.commit()
+            response_cache.bump(ORDERS)
+        return drift
@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Dict
+
+import joblib
+import numpy as np
+
+from app.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class ModelStore:
+    """
+    Ürün başına fit edilmiş model parametrelerini saklar.
+    Bellekte LRU, diskte joblib dosyaları; disk worker'lar arasında paylaşılır.
+    Kayıt: model tanımı, parametreler ve fit edilen verinin son günü (watermark).
+    """
+
+    def __init__(self, directory: str, maxsize: int = 2048):
+        self.directory = directory
+        self.memory = TTLCache(maxsize=maxsize, ttl=float("inf"))
+
+    def _path(self, product_id: int, spec: str) -> str:
+        spec_hash = hashlib.sha1(spec.encode()).hexdigest()[:12]
+        return os.path.join(self.directory, f"{product_id}-{spec_hash}.joblib")
+
+    def _load(self, path: str) -> Dict[str, Any] | None:
+        try:
+            entry = joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Could not load model {path}: {e}")
+            return None
+        entry["mtime"] = os.path.getmtime(path)
+        return entry
+
+    def _dump(self, path: str, entry: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        # Yarım yazılmış dosyayı başka worker okumasın diye önce geçici dosyaya yazılır
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, path)
+
+    async def get(self, product_id: int, spec: str) -> Dict[str, Any] | None:
+        path = self._path(product_id, spec)
+        entry = self.memory.get((product_id, spec))
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        # Başka bir worker (ör. gece işi) daha yeni bir model yazdıysa diskten tazelenir
+        if entry is None or (mtime is not None and mtime > entry["mtime"]):
+            entry = await asyncio.to_thread(self._load, path)
+            if entry is None:
+                return None
+            self.memory.set((product_id, spec), entry)
+        return entry
+
+    async def put(self, product_id: int, spec: str, params: np.ndarray, watermark: date, nobs: int):
+        entry = {
+            "spec": spec,
+            "params": np.asarray(params, dtype="float64"),
+            "watermark": watermark,
+            "nobs": nobs,
+            "fitted_at": datetime.utcnow(),
+        }
+        path = self._path(product_id, spec)
+        try:
+            await asyncio.to_thread(self._dump, path, entry)
+            entry["mtime"] = os.path.getmtime(path)
+        except OSError as e:
+            logger.error(f"Could not persist model {path}: {e}")
+            entry["mtime"] = float("inf")
+        self.memory.set((product_id, spec), entry)
+
+    def stats(self) -> dict:
+        return self.memory.stats()
+
+
+model_store = ModelStore(
+    directory=os.getenv("MODEL_STORE_DIR", "model_store"),
+    maxsize=int(os.getenv("MODEL_STORE_CACHE_SIZE", "2048")),
+)
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import os
+from typing import Iterable, List, Set, Tuple
+
+from app.database import AsyncSessionLocal
+from app.models import Order, Product
+from app.repositories.order_repository import OrderRepository
+from app.schemas import OrderCreate
+
+logger = logging.getLogger(__name__)
+
+# Flush task'ları burada tutulur; _flush_later kendi referansını flush'tan önce bıraktığı için
+# başka referans kalmaz ve task yarıda GC'ye gidebilir
+_flush_tasks: Set[asyncio.Task] = set()
+
+
+def _flush_done(task: asyncio.Task):
+    _flush_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Coalesced order flush task failed: {task.exception()!r}")
+
+
+class OrderCoalescer:
+    """
+    Sıcak (hot) ürünlerin siparişlerini birkaç milisaniyelik pencerelerde toplar
+    ve OrderRepository.create_bulk ile tek transaction'da yazar.
+    Ürün satırı kilidi sipariş başına değil batch başına bir kez alınır;
+    stok kontrolü yine kilit altında yapıldığı için overselling olmaz.
+    """
+
+    def __init__(self, hot_product_ids: Iterable[int] = (), flush_interval_ms: float = 5,
+                 max_batch_size: int = 500):
+        self.hot_product_ids = set(hot_product_ids)
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[OrderCreate, asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    def is_hot(self, product_id: int) -> bool:
+        return product_id in self.hot_product_ids
+
+    def mark_hot(self, product_id: int):
+        self.hot_product_ids.add(product_id)
+
+    def unmark_hot(self, product_id: int):
+        self.hot_product_ids.discard(product_id)
+
+    async def submit(self, order_create: OrderCreate) -> Tuple[Order, Product]:
+        """Siparişi bir sonraki batch'e ekler ve batch yazılınca (order, product) döner"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((order_create, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._spawn(self._flush(self._take_pending()))
+        elif self._flush_task is None:
+            self._flush_task = self._spawn(self._flush_later())
+
+        return await future
+
+    @staticmethod
+    def _spawn(coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        _flush_tasks.add(task)
+        task.add_done_callback(_flush_done)
+        return task
+
+    def _take_pending(self) -> List[Tuple[OrderCreate, asyncio.Future]]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        await self._flush(self._take_pending())
+
+    async def _flush(self, batch: List[Tuple[OrderCreate, asyncio.Future]]):
+        if not batch:
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                lines, products = await OrderRepository(db).create_bulk([order for order, _ in batch])
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} coalesced orders: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (order_create, future), line in zip(batch, lines):
+            if future.done():
+                continue
+            if isinstance(line, str):
+                future.set_exception(ValueError(line))
+            else:
+                future.set_result((line, products[order_create.product_id]))
+
+
+order_coalescer = OrderCoalescer(
+    hot_product_ids=[int(pid) for pid in os.getenv("HOT_PRODUCT_IDS", "").split(",") if pid.strip()],
+    flush_interval_ms=float(os.getenv("HOT_ORDER_FLUSH_MS", "5")),
+)
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Hashable, List, Set
+
+from sqlalchemy import inspect as sa_inspect
+
+from app.cache import TTLCache, unshared_ttl
+from app.models import Product
+from app.redis import REDIS_URL, get_redis
+from app.services.response_cache import response_cache, PRODUCTS
+
+logger = logging.getLogger(__name__)
+
+# Yayın task'larına referans tutulur; tutulmazsa event loop bitmeden GC tarafından toplanabilirler
+_publish_tasks: Set[asyncio.Task] = set()
+
+
+def _publish_done(task: asyncio.Task):
+    _publish_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Product cache invalidation publish task failed: {task.exception()!r}")
+
+
+class ProductCache:
+    """
+    ProductRepository.get/list önündeki process içi cache.
+    ORM nesnesi yerine kolon değerleri saklanır; nesneler her oturuma ayrıca bağlanır.
+    Redis varsa invalidation mesajları diğer uvicorn worker'larına da yayınlanır.
+    Redis yoksa invalidation yalnızca bu süreçte geçerlidir; bkz. app.cache.unshared_ttl.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 30, count_ttl: float = 60,
+                 channel: str = "product_cache_invalidation"):
+        self.items = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.pages = TTLCache(maxsize=256, ttl=ttl)
+        self.counts = TTLCache(maxsize=16, ttl=count_ttl)
+        self.channel = channel
+        self._instance_id = uuid.uuid4().hex
+
+    @staticmethod
+    def snapshot(product: Product) -> dict:
+        return {attr.key: getattr(product, attr.key) for attr in sa_inspect(Product).column_attrs}
+
+    def get(self, product_id: int) -> dict | None:
+        return self.items.get(product_id)
+
+    def set(self, product: Product):
+        self.items.set(product.id, self.snapshot(product))
+
+    def get_page(self, key: Hashable) -> List[dict] | None:
+        return self.pages.get(key)
+
+    def set_page(self, key: Hashable, products: List[Product]):
+        self.pages.set(key, [self.snapshot(product) for product in products])
+
+    def invalidate(self, *product_ids: int, publish: bool = True):
+        """Ürünleri ve tüm liste sayfalarını cache'den düşürür"""
+        for product_id in product_ids:
+            self.items.pop(product_id)
+        self.pages.clear()
+        response_cache.bump(PRODUCTS)
+        if publish and REDIS_URL:
+            self._publish_in_background(list(product_ids))
+
+    def invalidate_counts(self, publish: bool = True):
+        """Ürün eklenip silindiğinde toplam sayı cache'ini düşürür"""
+        self.counts.clear()
+        if publish and REDIS_URL:
+            self._publish_in_background([], counts=True)
+
+    def clear(self, publish: bool = True):
+        self.items.clear()
+        self.pages.clear()
+        self.counts.clear()
+        response_cache.bump(PRODUCTS)
+        if publish and REDIS_URL:
+            self._publish_in_background(None)
+
+    def _publish_in_background(self, product_ids: List[int] | None, counts: bool = False):
+        task = asyncio.create_task(self._publish(product_ids, counts))
+        _publish_tasks.add(task)
+        task.add_done_callback(_publish_done)
+
+    async def _publish(self, product_ids: List[int] | None, counts: bool = False):
+        message = {"source": self._instance_id, "ids": product_ids}
+        if counts:
+            message["counts"] = True
+        try:
+            redis = await get_redis()
+            if redis:
+                await redis.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Product cache invalidation publish failed: {e}")
+
+    async def listen(self):
+        """Diğer worker'ların invalidation mesajlarını dinler (startup'ta task olarak çalışır)"""
+        while True:
+            try:
+                redis = await get_redis()
+                if not redis:
+                    return
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    self._handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Product cache invalidation listener failed: {e}")
+                # Bağlantı koptuysa kaçırılan mesajlar olabilir
+                self.clear(publish=False)
+                await asyncio.sleep(5)
+
+    def _handle_message(self, message: dict):
+        if message.get("type") != "message":
+            return
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if data.get("source") == self._instance_id:
+            return
+        if data.get("counts"):
+            self.invalidate_counts(publish=False)
+        elif data.get("ids") is None:
+            self.clear(publish=False)
+        else:
+            self.invalidate(*data["ids"], publish=False)
+
+    def stats(self) -> dict:
+        return {"products": self.items.stats(), "pages": self.pages.stats(), "counts": self.counts.stats()}
+
+
+product_cache = ProductCache(
+    maxsize=int(os.getenv("PRODUCT_CACHE_SIZE", "10000")),
+    ttl=unshared_ttl(float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "30")), "product cache"),
+    count_ttl=unshared_ttl(float(os.getenv("PRODUCT_COUNT_TTL_SECONDS", "60")), "product count cache"),
+)
@@ -0,0 +1,162 @@
+import asyncio
+import csv
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models import Product
+from app.schemas import ProductCreate
+from app.services.product_cache import product_cache
+
+logger = logging.getLogger(__name__)
+
+IMPORT_COLUMNS = ("name", "description", "price", "stock", "critical_stock")
+STAGING_TABLE = "product_import_staging"
+MAX_REPORTED_REJECTIONS = 100
+# SQLite'ta çok satırlı upsert satır x kolon kadar parametre bağlar (sınır 32766)
+MAX_CHUNK_SIZE = 5000
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    rows_valid: int = 0
+    rows_rejected: int = 0
+    rows_merged: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_sec: float = 0.0
+    rejected: List[Dict[str, Any]] = field(default_factory=list)
+
+    def reject(self, line: int, error: str):
+        self.rows_rejected += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTIONS:
+            self.rejected.append({"line": line, "error": error})
+
+    def dict(self) -> dict:
+        return asdict(self)
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any] | Exception]]:
+    """Satırları (satır_no, kayıt ya da hata) olarak akış halinde okur"""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            # Boş hücreler şemadaki varsayılanları kullansın
+            yield reader.line_num, {key: value for key, value in record.items() if key and value != ""}
+    elif fmt == "ndjson":
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, e
+                continue
+            yield line_no, record if isinstance(record, dict) else ValueError("Expected a JSON object")
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+async def import_products(db: AsyncSession, lines: Iterable[str], fmt: str, chunk_size: int = 5000) -> ImportReport:
+    """
+    Ürün kataloğunu parça parça (en fazla MAX_CHUNK_SIZE satır) doğrulayıp yükler, isim üzerinden upsert eder.
+    asyncpg ile COPY -> staging tablo -> tek INSERT ... ON CONFLICT; diğer sürücülerde parça başına upsert
+    (yalnızca PostgreSQL ve SQLite; diğer veritabanlarında dialect_insert NotImplementedError verir).
+    """
+    chunk_size = min(max(chunk_size, 1), MAX_CHUNK_SIZE)
+    report = ImportReport()
+    started = time.perf_counter()
+    conn = await db.connection()
+    use_copy = conn.dialect.driver == "asyncpg"
+
+    if use_copy:
+        await conn.execute(text(
+            f"CREATE TEMP TABLE {STAGING_TABLE} (seq bigint, name text, description text, "
+            f"price integer, stock integer, critical_stock integer) ON COMMIT DROP"
+        ))
+
+    records = iter_records(lines, fmt)
+    try:
+        while True:
+            # Dosya okuma, parse ve doğrulama event loop'u bloklamasın diye thread'de yapılır;
+            # loop'ta yalnızca DB yüklemesi beklenir
+            chunk = await asyncio.to_thread(_read_chunk, records, report, chunk_size)
+            if not chunk:
+                break
+            report.rows_merged += await _load_chunk(db, conn, chunk, use_copy)
+
+        if use_copy:
+            report.rows_merged = await _merge_staging(conn)
+
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    product_cache.clear()
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    report.rows_per_sec = round(report.rows_read / report.elapsed_seconds, 1) if report.elapsed_seconds else 0.0
+    logger.info(f"Product import finished: {report.rows_merged} merged, {report.rows_rejected} rejected, "
+                f"{report.rows_per_sec} rows/sec")
+    return report
+
+
+def _read_chunk(records: Iterator[Tuple[int, Dict[str, Any] | Exception]], report: ImportReport,
+                chunk_size: int) -> List[tuple]:
+    """En fazla chunk_size geçerli satırı okuyup doğrular; dosya bittiyse boş liste döner"""
+    chunk: List[tuple] = []
+    for line_no, record in records:
+        report.rows_read += 1
+        if isinstance(record, Exception):
+            report.reject(line_no, str(record))
+            continue
+        try:
+            product = ProductCreate(**record)
+        except ValidationError as e:
+            report.reject(line_no, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            continue
+
+        report.rows_valid += 1
+        chunk.append((line_no, *(getattr(product, column) for column in IMPORT_COLUMNS)))
+        if len(chunk) >= chunk_size:
+            break
+    return chunk
+
+
+async def _load_chunk(db: AsyncSession, conn, chunk: List[tuple], use_copy: bool) -> int:
+    if use_copy:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=chunk, columns=("seq", *IMPORT_COLUMNS)
+        )
+        return 0
+
+    # Aynı isim parçada birden fazla geçiyorsa son satır kazanır
+    rows = {row[1]: dict(zip(IMPORT_COLUMNS, row[1:])) for row in chunk}
+    insert = dialect_insert(db)
+    stmt = insert(Product).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Product.name],
+        set_={column: stmt.excluded[column] for column in IMPORT_COLUMNS if column != "name"},
+    )
+    await conn.execute(stmt)
+    return len(rows)
+
+
+async def _merge_staging(conn) -> int:
+    columns = ", ".join(IMPORT_COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in IMPORT_COLUMNS if column != "name")
+    result = await conn.execute(text(
+        f"INSERT INTO {Product.__tablename__} ({columns}) "
+        f"SELECT DISTINCT ON (name) {columns} FROM {STAGING_TABLE} ORDER BY name, seq DESC "
+        f"ON CONFLICT (name) DO UPDATE SET {updates}"
+    ))
+    return result.rowcount
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Set, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.cache import TTLCache, unshared_ttl
+from app.redis import REDIS_URL, get_redis
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS = "products"
+ORDERS = "orders"
+
+Builder = Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+
+
+class ResponseCache:
+    """
+    Sık poll edilen GET endpoint'leri için ETag / 304 ve response cache.
+    Yazma yolları ilgili veri versiyonunu artırır. ETag (yol, sorgu, versiyonlar)'dan türetilir;
+    If-None-Match eşleşirse DB'ye gidilmeden ve serialize edilmeden 304 döner.
+    Redis varsa versiyonlar orada tutulur ve tüm worker'larda aynıdır; yoksa süreç içidir ve
+    ETag worker'a özgü olur (başka worker'ın ETag'i hiçbir zaman eşleşmez).
+    TTL yalnızca uygulama dışından yapılan değişikliklere karşı güvenlik ağıdır.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60, use_redis: bool = False):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.use_redis = use_redis
+        self.versions: Dict[str, int] = defaultdict(int)
+        self._instance_id = uuid.uuid4().hex
+        self._pending_bumps: Set[asyncio.Task] = set()
+        self.not_modified = 0
+
+    def bump(self, *scopes: str):
+        for scope in scopes:
+            self.versions[scope] += 1
+        if self.use_redis:
+            task = asyncio.create_task(self._publish_bump(scopes))
+            self._pending_bumps.add(task)
+            task.add_done_callback(self._pending_bumps.discard)
+
+    async def _publish_bump(self, scopes: Iterable[str]):
+        try:
+            redis = await get_redis()
+            if redis:
+                # Sayaç yerine rastgele token: Redis sıfırlansa da eski bir ETag'le çakışmaz
+                for scope in scopes:
+                    await redis.set(f"response_version:{scope}", uuid.uuid4().hex)
+        except Exception as e:
+            logger.error(f"Response cache version publish failed: {e}")
+
+    async def _current_versions(self, scopes: Tuple[str, ...]) -> tuple:
+        """(kaynak, ((scope, versiyon), ...)); Redis'e ulaşılamazsa süreç içi versiyonlar kullanılır"""
+        if self.use_redis:
+            # Bu worker'ın kendi yazmaları okunmadan önce Redis'e ulaşmış olmalı
+            if self._pending_bumps:
+                await asyncio.gather(*self._pending_bumps, return_exceptions=True)
+            try:
+                redis = await get_redis()
+                if redis:
+                    keys = [f"response_version:{scope}" for scope in scopes]
+                    values = await redis.mget(keys)
+                    for i, value in enumerate(values):
+                        if value is None:
+                            await redis.set(keys[i], uuid.uuid4().hex, nx=True)
+                            values[i] = await redis.get(keys[i])
+                    return "shared", tuple(zip(scopes, values))
+            except Exception as e:
+                logger.error(f"Response cache version lookup failed: {e}")
+        return self._instance_id, tuple((scope, self.versions[scope]) for scope in scopes)
+
+    def _etag(self, request: Request, versions: tuple) -> str:
+        # TTL penceresi de anahtara girer; uygulama dışı değişiklikler en geç TTL sonunda görünür
+        window = int(time.time() // self.entries.ttl) if self.entries.ttl > 0 else time.time()
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())), versions, window)
+        return f'"{hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()}"'
+
+    @staticmethod
+    def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+        if not if_none_match:
+            return False
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    async def respond(self, request: Request, scopes: Iterable[str], build: Builder) -> Response:
+        """If-None-Match eşleşirse 304; değilse cache'lenmiş gövdeyi döner ya da build() ile üretip cache'ler"""
+        # Versiyon build'den önce okunur; build sırasında gelen yazma bir sonraki isteği ıskalatır
+        versions = await self._current_versions(tuple(scopes))
+        etag = self._etag(request, versions)
+        entry = self.entries.get(etag)
+
+        if self._etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            headers = entry[1] if entry is not None else {}
+            return Response(status_code=304, headers={**headers, "ETag": etag, "Cache-Control": "no-cache"})
+
+        if entry is None:
+            payload, headers = await build()
+            body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+            entry = (body, headers)
+            self.entries.set(etag, entry)
+
+        body, headers = entry
+        headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        return {**self.entries.stats(), "not_modified": self.not_modified, "versions": dict(self.versions)}
+
+
+response_cache = ResponseCache(
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "512")),
+    ttl=unshared_ttl(float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60")), "response cache"),
+    use_redis=bool(REDIS_URL),
+)
@@ -0,0 +1,109 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models import DailyProductSales, MaintenanceMarker, Order
+
+BACKFILL_MARKER = "daily_product_sales_backfill"
+
+
+async def record_sales(db: AsyncSession, orders):
+    """
+    Siparişleri (ürün, gün) bazında daily_product_sales'e ekler (commit etmez).
+    Siparişlerin flush edilmiş olması, yani order_date'in dolu olması gerekir.
+    """
+    totals: Dict[Tuple[int, date], List[int]] = defaultdict(lambda: [0, 0])
+    for order in orders:
+        total = totals[(order.product_id, order.order_date.date())]
+        total[0] += order.quantity
+        total[1] += order.total
+    if not totals:
+        return
+
+    insert = dialect_insert(db)
+    stmt = insert(DailyProductSales).values([
+        {"product_id": product_id, "day": day, "qty": qty, "revenue": revenue}
+        for (product_id, day), (qty, revenue) in sorted(totals.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyProductSales.product_id, DailyProductSales.day],
+        set_={
+            "qty": DailyProductSales.qty + stmt.excluded.qty,
+            "revenue": DailyProductSales.revenue + stmt.excluded.revenue,
+        },
+    )
+    await db.execute(stmt)
+
+
+class SalesRollupState:
+    """
+    Özet tablonun backfill edilip edilmediği. Backfill'den önce özet yalnızca deploy sonrası
+    siparişleri içerir; okuyucular o zamana kadar orders tablosunu kullanır.
+    """
+
+    def __init__(self):
+        self.backfilled = False
+
+    async def is_backfilled(self, db: AsyncSession) -> bool:
+        # Marker bir kez görülünce bir daha sorgulanmaz
+        if not self.backfilled:
+            self.backfilled = await db.get(MaintenanceMarker, BACKFILL_MARKER) is not None
+        return self.backfilled
+
+
+sales_rollup_state = SalesRollupState()
+
+
+async def backfill_daily_sales(db: AsyncSession, include_today: bool = False) -> int:
+    """
+    Özet tabloyu orders tablosundan yeniden hesaplar (mevcut satırların üzerine yazar) ve
+    tamamlandığını maintenance_markers'a kaydeder.
+    record_sales yalnızca siparişin gününe (UTC bugün) yazdığı için geçmiş günler eşzamanlı
+    siparişlerle yarışmaz; bugünün satırı üzerine yazılırsa backfill'in snapshot'ından sonra
+    commit edilen siparişlerin artışı kaybolur. include_today yalnızca siparişler durdurulmuşken
+    (ör. deploy günü, eski sürümün bugünkü siparişlerini eklemek için) kullanılmalıdır.
+    """
+    day = func.date(Order.order_date)
+    # order_date UTC olarak yazılır
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    orders = select(Order.product_id, day, func.sum(Order.quantity), func.sum(Order.total)).where(
+        Order.order_date.isnot(None)
+    )
+    if not include_today:
+        orders = orders.where(Order.order_date < today_start)
+
+    insert = dialect_insert(db)
+    stmt = insert(DailyProductSales).from_select(
+        ["product_id", "day", "qty", "revenue"],
+        orders.group_by(Order.product_id, day),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyProductSales.product_id, DailyProductSales.day],
+        set_={"qty": stmt.excluded.qty, "revenue": stmt.excluded.revenue},
+    )
+    result = await db.execute(stmt)
+    await db.execute(insert(MaintenanceMarker).values(name=BACKFILL_MARKER).on_conflict_do_nothing())
+    await db.commit()
+    sales_rollup_state.backfilled = True
+    return result.rowcount
+
+
+async def fetch_sales_history(db: AsyncSession, days: int, product_id: int | None = None):
+    """Son `days` günün günlük toplam satış adedi ve cirosu"""
+    stmt = (
+        select(DailyProductSales.day, func.sum(DailyProductSales.qty), func.sum(DailyProductSales.revenue))
+        .where(DailyProductSales.day >= date.today() - timedelta(days=days - 1))
+        .group_by(DailyProductSales.day)
+        .order_by(DailyProductSales.day)
+    )
+    if product_id is not None:
+        stmt = stmt.where(DailyProductSales.product_id == product_id)
+    result = await db.execute(stmt)
+    return [
+        {"date": day.isoformat(), "quantity": int(qty), "revenue": int(revenue)}
+        for day, qty, revenue in result.all()
+    ]
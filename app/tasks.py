@@ -1,50 +1,71 @@
 import asyncio
 from datetime import datetime
-from sqlalchemy.future import select
 
 from app.emails import send_bulk_test_email
-from app.models import Product
 from app.database import AsyncSessionLocal, get_db
 from app.repositories.product_repository import ProductRepository
+from app.services.product_cache import product_cache
 from app.events.event_bus import event_bus, EventType, logger
 from app.websocket_manager import manager
 
 
 async def update_stock(product_id: int, quantity: int):
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Product).filter(Product.id == product_id))
-        product = result.scalars().first()
+        product_repo = ProductRepository(session)
+        product = await product_repo.decrement_stock(product_id, quantity)
         if not product:
-            return "Product not found"
-        if product.stock < quantity:
+            await session.rollback()
+            if not await product_repo.get(product_id):
+                return "Product not found"
             return "Insufficient stock"
-
-        old_stock = product.stock
-        product.stock -= quantity
         await session.commit()
+        product_cache.invalidate(product_id)
 
-        # Stok kritik seviyeye düştüyse event publish et
-        if product.stock <= product.critical_stock and old_stock > product.critical_stock:
-            await event_bus.publish(EventType.CRITICAL_STOCK, {
-                "product_id": product.id,
-                "product_name": product.name,
-                "stock_level": product.stock,
-                "critical_level": product.critical_stock,
-                "timestamp": datetime.now().isoformat()
-            })
-
+        await publish_critical_stock_event(product, product.stock + quantity)
         return "Stock updated"
 
 
+async def publish_critical_stock_event(product, old_stock: int):
+    """Stok bu güncellemeyle kritik seviyeye düştüyse CRITICAL_STOCK event'i yayınlar"""
+    if product.stock <= product.critical_stock < old_stock:
+        await event_bus.publish(EventType.CRITICAL_STOCK, {
+            "product_id": product.id,
+            "product_name": product.name,
+            "stock_level": product.stock,
+            "critical_level": product.critical_stock,
+            "timestamp": datetime.now().isoformat()
+        })
+
+
+async def notify_critical_stock_batch(products):
+    """Kritik seviyeye yeni düşen ürünler için tek websocket yayını ve tek toplu email gönderir"""
+    try:
+        await manager.broadcast({
+            "type": "critical_stock_batch",
+            "products": [
+                {
+                    "product_id": product.id,
+                    "name": product.name,
+                    "stock": product.stock,
+                    "critical_stock": product.critical_stock,
+                }
+                for product in products
+            ],
+            "timestamp": datetime.now().isoformat()
+        })
+        await send_bulk_test_email(products)
+    except Exception as e:
+        logger.error(f"Error sending critical stock batch notification: {e}")
+
+
 async def check_critical_stock_and_notify():
     async for db in get_db():
         product_repo = ProductRepository(db)
-        products = await product_repo.list()
+        products = await product_repo.filter()
         for product in products:
-            if product.stock <= product.critical_stock:
-                message = f"Product '{product.name}' stock is critical: {product.stock}"
-                for user_id in manager.active_connections.keys():
-                    await manager.send_personal_message(message, user_id)
+            message = f"Product '{product.name}' stock is critical: {product.stock}"
+            for user_email in list(manager.active_connections.keys()):
+                await manager.send_personal_message(user_email, {"message": message})
 
 async def periodic_critical_stock_check():
     while True:
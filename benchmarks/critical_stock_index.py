@@ -0,0 +1,160 @@
+"""
+Kritik stok partial index benchmark'ı.
+
+Geçici bir tabloya büyük bir katalog (varsayılan 1M ürün, ~%1'i kritik) yükler ve
+"stock <= critical_stock" listeleme/sayma sorgularını partial index olmadan ve
+partial index ile ölçer.
+
+Index'in yazma tarafındaki maliyeti de ölçülür: sipariş yolundaki koşullu stok düşümü
+(UPDATE ... SET stock = stock - q WHERE id = ? AND stock >= q) her siparişi ayrı transaction
+olarak, index'li ve index'siz çalıştırılır. PostgreSQL'de predicate'teki stock kolonu
+index'li sayıldığından bu UPDATE'ler HOT olamaz; pg_stat_user_tables'tan HOT oranı da raporlanır.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.critical_stock_index --products 1000000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, bindparam, func, select, text
+
+from app.database import engine
+
+metadata = MetaData()
+bench_products = Table(
+    "bench_critical_products",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, unique=True, nullable=False),
+    Column("stock", Integer),
+    Column("critical_stock", Integer),
+)
+critical_index = Index(
+    "ix_bench_critical_products_critical",
+    bench_products.c.id,
+    postgresql_where=bench_products.c.stock <= bench_products.c.critical_stock,
+    sqlite_where=bench_products.c.stock <= bench_products.c.critical_stock,
+)
+is_critical = bench_products.c.stock <= bench_products.c.critical_stock
+
+
+async def _load(conn, products: int, critical_ratio: float, chunk: int = 20000):
+    rng = random.Random(42)
+    for start in range(0, products, chunk):
+        rows = []
+        for i in range(start, min(start + chunk, products)):
+            critical = rng.random() < critical_ratio
+            rows.append({
+                "id": i + 1,
+                "name": f"product-{i}",
+                "stock": rng.randint(0, 10) if critical else rng.randint(11, 1000),
+                "critical_stock": 10,
+            })
+        await conn.execute(bench_products.insert(), rows)
+
+
+async def _timed(conn, stmt, repeat: int) -> tuple[float, object]:
+    result = None
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = (await conn.execute(stmt)).all()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+async def _measure(conn, label: str, repeat: int):
+    list_stmt = select(bench_products).where(is_critical).order_by(bench_products.c.id).limit(100)
+    count_stmt = select(func.count()).select_from(bench_products).where(is_critical)
+    list_ms, _ = await _timed(conn, list_stmt, repeat)
+    count_ms, rows = await _timed(conn, count_stmt, repeat)
+    print(f"{label:16} list(100) {list_ms:9.2f} ms   count {count_ms:9.2f} ms   critical={rows[0][0]}")
+
+
+decrement_stmt = (
+    bench_products.update()
+    .where(bench_products.c.id == bindparam("product_id"), bench_products.c.stock >= bindparam("quantity"))
+    .values(stock=bench_products.c.stock - bindparam("quantity"))
+)
+
+
+async def _update_stats() -> tuple[int, int] | None:
+    """PostgreSQL'de tablonun (update, HOT update) sayaçları; diğer veritabanlarında None"""
+    if engine.dialect.name != "postgresql":
+        return None
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_stat_clear_snapshot()"))
+        row = (await conn.execute(
+            text("SELECT n_tup_upd, n_tup_hot_upd FROM pg_stat_user_tables WHERE relname = :table"),
+            {"table": bench_products.name},
+        )).one()
+    return int(row[0]), int(row[1])
+
+
+async def _measure_writes(label: str, products: int, orders: int, concurrency: int):
+    """orders adet siparişi concurrency bağlantıya bölüp her birini ayrı transaction'da uygular"""
+    rng = random.Random(7)
+    product_ids = [rng.randint(1, products) for _ in range(orders)]
+    before = await _update_stats()
+
+    async def worker(ids):
+        async with engine.connect() as conn:
+            for product_id in ids:
+                async with conn.begin():
+                    await conn.execute(decrement_stmt, {"product_id": product_id, "quantity": 1})
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(product_ids[i::concurrency]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    line = f"{label:16} orders {orders / elapsed:9.0f}/s   mean {elapsed / orders * 1000 * concurrency:7.3f} ms"
+    after = await _update_stats()
+    if before is not None and after is not None:
+        # İstatistikler transaction sonunda gecikmeli yazılabilir; oran yaklaşık değerdir
+        updates, hot = after[0] - before[0], after[1] - before[1]
+        line += f"   HOT {hot}/{updates}"
+    print(line)
+
+
+async def run(products: int, critical_ratio: float, repeat: int, orders: int, concurrency: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+        started = time.perf_counter()
+        await _load(conn, products, critical_ratio)
+        print(f"loaded {products} products in {time.perf_counter() - started:.1f}s")
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(critical_index.drop)
+            await conn.execute(text(f"ANALYZE {bench_products.name}"))
+            await _measure(conn, "full scan", repeat)
+            await conn.run_sync(critical_index.create)
+            await conn.execute(text(f"ANALYZE {bench_products.name}"))
+            await _measure(conn, "partial index", repeat)
+
+        # Yazma tarafı: aynı sipariş akışı index'li ve index'siz
+        if orders:
+            await _measure_writes("writes + index", products, orders, concurrency)
+            async with engine.begin() as conn:
+                await conn.run_sync(critical_index.drop)
+            await _measure_writes("writes, no index", products, orders, concurrency)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.drop_all)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--critical-ratio", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--orders", type=int, default=20000, help="stock decrements per write run (0 skips)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    engine.echo = False
+    asyncio.run(run(args.products, args.critical_ratio, args.repeat, args.orders, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
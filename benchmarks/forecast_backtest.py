@@ -0,0 +1,179 @@
+"""
+Tahmin stratejileri için backtest ve fit süresi benchmark'ı (DB gerektirmez).
+
+Sentetik günlük satış geçmişleri üretir (trend + haftalık sezon, gürültülü sezon, kesikli talep)
+ve forecast_service'teki her stratejiyi rolling-origin ile değerlendirir: her seri için son
+`origins` başlangıç noktasında geçmişin o noktaya kadarki kısmıyla fit edip `horizon` gün tahmin eder.
+
+Strateji başına MAPE (satış olan günlerde), MASE (örnek içi 7 günlük mevsimsel naive'e göre),
+fit gecikmesi (ortalama/p50/p95), throughput ve en yüksek Python bellek kullanımı raporlanır.
+Sonuçlar zaman içinde takip edilebilmesi için JSON olarak yazılır.
+
+    python -m benchmarks.forecast_backtest --series 10
+
+Rapor varsayılan olarak benchmarks/results/ altına yazılır (git'e girmez); --output - stdout'a yazar.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "forecast_backtest.json")
+
+# forecast_service app.database'i import eder; engine bağlanmadan oluşturulduğu için DB gerekmez
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+import statsmodels  # noqa: E402
+
+from app.services.batch_forecast_service import seasonal_naive  # noqa: E402
+from app.services.forecast_service import (  # noqa: E402
+    SARIMAX_SPEC, _croston_forecast, _naive_forecast, _sarimax_fit, _smoothing_forecast,
+)
+
+
+def _seasonal_naive_forecast(series: pd.Series, horizon: int) -> pd.Series:
+    fc = seasonal_naive(series.to_numpy(dtype="float64")[None, :], horizon)[0]
+    return pd.Series(fc, index=pd.date_range(series.index.max() + pd.Timedelta(days=1), periods=horizon, freq="D"))
+
+
+STRATEGIES = {
+    "naive_last7_mean": _naive_forecast,
+    "seasonal_naive[7]": _seasonal_naive_forecast,
+    "holt_winters_additive[7]": _smoothing_forecast,
+    "croston_sba": _croston_forecast,
+    SARIMAX_SPEC: lambda series, horizon: _sarimax_fit(series, horizon)[0],
+}
+
+
+def synthetic_series(kind: str, days: int, rng: np.random.Generator) -> pd.Series:
+    t = np.arange(days)
+    if kind == "trend_weekly":
+        base = rng.uniform(10, 40) + rng.uniform(-0.02, 0.05) * t
+        weekly = rng.uniform(2, 8) * np.sin(2 * np.pi * t / 7 + rng.uniform(0, 2 * np.pi))
+        values = rng.poisson(np.maximum(base + weekly, 0.1))
+    elif kind == "noisy_seasonal":
+        base = rng.uniform(3, 10)
+        weekly = np.where(t % 7 >= 5, rng.uniform(1.5, 3), 1.0)
+        values = rng.negative_binomial(2, 2 / (2 + base * weekly))
+    elif kind == "intermittent":
+        sold = rng.random(days) < rng.uniform(0.05, 0.3)
+        values = np.where(sold, rng.integers(1, 6, days), 0)
+    else:
+        raise ValueError(f"Unknown series kind: {kind}")
+    return pd.Series(values.astype("float64"), index=pd.date_range("2024-01-01", periods=days, freq="D"))
+
+
+def _mape(actual: np.ndarray, forecast: np.ndarray) -> float | None:
+    sold = actual > 0
+    if not sold.any():
+        return None
+    return float(np.mean(np.abs(actual[sold] - forecast[sold]) / actual[sold]))
+
+
+def _mase(train: np.ndarray, actual: np.ndarray, forecast: np.ndarray) -> float | None:
+    scale = np.mean(np.abs(train[7:] - train[:-7]))
+    if not scale:
+        return None
+    return float(np.mean(np.abs(actual - forecast)) / scale)
+
+
+def _summary(values):
+    values = [v for v in values if v is not None]
+    return round(float(np.mean(values)), 4) if values else None
+
+
+def backtest(kinds, series_per_kind: int, days: int, horizon: int, origins: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    dataset = {kind: [synthetic_series(kind, days, rng) for _ in range(series_per_kind)] for kind in kinds}
+    report = {}
+
+    for name, strategy in STRATEGIES.items():
+        per_kind = {}
+        fit_ms = []
+        for kind, series_list in dataset.items():
+            mape, mase = [], []
+            for series in series_list:
+                for k in range(origins, 0, -1):
+                    cut = days - k * horizon
+                    train, actual = series.iloc[:cut], series.iloc[cut:cut + horizon].to_numpy()
+                    started = time.perf_counter()
+                    forecast = strategy(train, horizon).to_numpy()
+                    fit_ms.append((time.perf_counter() - started) * 1000)
+                    mape.append(_mape(actual, forecast))
+                    mase.append(_mase(train.to_numpy(), actual, forecast))
+            per_kind[kind] = {"mape": _summary(mape), "mase": _summary(mase)}
+
+        # Bellek ölçümü tracemalloc yükü süreleri bozmasın diye ayrı, tek seri üzerinde yapılır
+        tracemalloc.start()
+        strategy(next(iter(dataset.values()))[0], horizon)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        fit_ms = np.asarray(fit_ms)
+        report[name] = {
+            "by_kind": per_kind,
+            "mape": _summary([v["mape"] for v in per_kind.values()]),
+            "mase": _summary([v["mase"] for v in per_kind.values()]),
+            "fits": int(len(fit_ms)),
+            "fit_ms_mean": round(float(fit_ms.mean()), 3),
+            "fit_ms_p50": round(float(np.percentile(fit_ms, 50)), 3),
+            "fit_ms_p95": round(float(np.percentile(fit_ms, 95)), 3),
+            "fits_per_second": round(float(len(fit_ms) / (fit_ms.sum() / 1000)), 2),
+            "peak_memory_mib": round(peak / 2 ** 20, 3),
+        }
+        print(f"{name:28} MAPE {report[name]['mape']!s:>8}  MASE {report[name]['mase']!s:>8}  "
+              f"fit p50 {report[name]['fit_ms_p50']:9.2f} ms  p95 {report[name]['fit_ms_p95']:9.2f} ms  "
+              f"{report[name]['fits_per_second']:9.1f} fits/s  peak {report[name]['peak_memory_mib']:7.2f} MiB")
+    return report
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", default=["trend_weekly", "noisy_seasonal", "intermittent"])
+    parser.add_argument("--series", type=int, default=10, help="series per kind")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--horizon", type=int, default=14)
+    parser.add_argument("--origins", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="report path, '-' for stdout")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    strategies = backtest(args.kinds, args.series, args.days, args.horizon, args.origins, args.seed)
+    report = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "statsmodels": statsmodels.__version__,
+        "params": vars(args),
+        "duration_seconds": round(time.perf_counter() - started, 2),
+        "strategies": strategies,
+    }
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
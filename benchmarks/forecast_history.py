@@ -0,0 +1,152 @@
+"""
+Tahmin geçmişi yükleme benchmark'ı.
+
+Geçici bir tabloya tek bir SKU için büyük bir sipariş geçmişi (varsayılan 1M sipariş, ~3 yıl)
+yükler ve günlük seriyi üç şekilde üretir:
+
+  * rows+pandas : tüm sipariş satırlarını çekip dict listesi kurar, pandas'ta gruplar (eski yol)
+  * sql group by: günü SQL'de gruplar, (gün, adet) satırlarını NumPy ile boşluk doldurarak seriye çevirir
+  * rollup      : önceden toplanmış (gün, adet) satırlarını aynı şekilde seriye çevirir
+
+Süre ve tracemalloc ile ölçülen en yüksek Python bellek kullanımı raporlanır.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.forecast_history --orders 1000000
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import Column, Date, DateTime, Integer, MetaData, Table, cast, func, select
+
+from app.database import engine
+from app.services.forecast_service import daily_series
+
+metadata = MetaData()
+bench_orders = Table(
+    "bench_forecast_orders",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("product_id", Integer, nullable=False, index=True),
+    Column("quantity", Integer, nullable=False),
+    Column("total", Integer, nullable=False),
+    Column("order_date", DateTime, nullable=False),
+)
+bench_daily = Table(
+    "bench_forecast_daily",
+    metadata,
+    Column("product_id", Integer, primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("qty", Integer, nullable=False),
+)
+PRODUCT_ID = 1
+
+
+async def _load(conn, orders: int, days: int, chunk: int = 20000):
+    rng = random.Random(42)
+    start = datetime(2022, 1, 1)
+    seconds = days * 86400
+    for first in range(0, orders, chunk):
+        rows = []
+        for i in range(first, min(first + chunk, orders)):
+            quantity = rng.randint(1, 5)
+            rows.append({
+                "id": i + 1,
+                "product_id": PRODUCT_ID,
+                "quantity": quantity,
+                "total": quantity * 100,
+                "order_date": start + timedelta(seconds=rng.randrange(seconds)),
+            })
+        await conn.execute(bench_orders.insert(), rows)
+
+
+def _day(dialect_name: str):
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc("day", bench_orders.c.order_date), Date)
+    return func.date(bench_orders.c.order_date, type_=Date)
+
+
+async def legacy_series(conn) -> pd.Series:
+    result = await conn.execute(select(bench_orders).where(bench_orders.c.product_id == PRODUCT_ID))
+    rows = [{"date": row.order_date, "qty": row.quantity} for row in result]
+    df = pd.DataFrame(rows)
+    df["date"] = pd.to_datetime(df["date"]).dt.floor("D")
+    return df.groupby("date")["qty"].sum().astype("float64").asfreq("D", fill_value=0.0)
+
+
+async def grouped_series(conn) -> pd.Series:
+    day = _day(conn.dialect.name)
+    stmt = (
+        select(day, func.sum(bench_orders.c.quantity))
+        .where(bench_orders.c.product_id == PRODUCT_ID)
+        .group_by(day)
+        .order_by(day)
+    )
+    days, qtys = zip(*(await conn.execute(stmt)).all())
+    return daily_series(days, qtys)
+
+
+async def rollup_series(conn) -> pd.Series:
+    stmt = (
+        select(bench_daily.c.day, bench_daily.c.qty)
+        .where(bench_daily.c.product_id == PRODUCT_ID)
+        .order_by(bench_daily.c.day)
+    )
+    days, qtys = zip(*(await conn.execute(stmt)).all())
+    return daily_series(days, qtys)
+
+
+async def _measure(conn, label: str, func_, repeat: int) -> pd.Series:
+    series = None
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        series = await func_(conn)
+    elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:14} {elapsed_ms:10.1f} ms   peak {peak / 2 ** 20:8.1f} MiB   "
+          f"days={len(series)} total={int(series.sum())}")
+    return series
+
+
+async def run(orders: int, days: int, repeat: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+        started = time.perf_counter()
+        await _load(conn, orders, days)
+        day = _day(conn.dialect.name)
+        await conn.execute(bench_daily.insert().from_select(
+            ["product_id", "day", "qty"],
+            select(bench_orders.c.product_id, day, func.sum(bench_orders.c.quantity))
+            .group_by(bench_orders.c.product_id, day),
+        ))
+        print(f"loaded {orders} orders in {time.perf_counter() - started:.1f}s")
+
+    try:
+        async with engine.connect() as conn:
+            legacy = await _measure(conn, "rows+pandas", legacy_series, repeat)
+            grouped = await _measure(conn, "sql group by", grouped_series, repeat)
+            rollup = await _measure(conn, "rollup", rollup_series, repeat)
+        assert legacy.values.tolist() == grouped.values.tolist() == rollup.values.tolist()
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.drop_all)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.orders, args.days, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Hot-SKU benchmark'ı: satır kilidi ile sipariş başına yazma vs. birleştirilmiş (coalesced) yazma.
+
+Aynı ürüne eşzamanlı siparişler gönderir, her iki mod için saniyedeki sipariş
+sayısını ve gecikme yüzdeliklerini raporlar, stoğun eksiye düşmediğini doğrular.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.hot_sku --orders 3000 --concurrency 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, select
+
+from app.database import AsyncSessionLocal, Base, engine
+from app.models import Order, Product
+from app.repositories.order_repository import OrderRepository
+from app.schemas import OrderCreate
+from app.services.order_coalescer import OrderCoalescer
+
+
+async def _create_product(stock: int) -> int:
+    async with AsyncSessionLocal() as db:
+        product = Product(name=f"hot-{uuid.uuid4().hex[:8]}", price=10, stock=stock, critical_stock=0)
+        db.add(product)
+        await db.commit()
+        return product.id
+
+
+async def _drop_product(product_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        stock = await db.scalar(select(Product.stock).where(Product.id == product_id))
+        await db.execute(delete(Order).where(Order.product_id == product_id))
+        await db.execute(delete(Product).where(Product.id == product_id))
+        await db.commit()
+        return stock
+
+
+async def _row_lock(order: OrderCreate):
+    async with AsyncSessionLocal() as db:
+        return await OrderRepository(db).place(order)
+
+
+async def run_mode(name: str, place, orders: int, concurrency: int, stock: int):
+    product_id = await _create_product(stock)
+    order = OrderCreate(product_id=product_id, quantity=1)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    placed = 0
+
+    async def one():
+        nonlocal placed
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await place(order)
+                placed += 1
+            except ValueError:
+                pass
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(orders)))
+    elapsed = time.perf_counter() - started
+    final_stock = await _drop_product(product_id)
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:10} {orders / elapsed:10.1f} orders/s   p50 {statistics.median(latencies) * 1000:7.1f} ms"
+          f"   p99 {p99 * 1000:7.1f} ms   placed {placed}   final stock {final_stock}")
+
+    assert final_stock >= 0, "stock went negative"
+    assert final_stock == stock - placed, "stock does not match placed orders"
+
+
+async def run(orders: int, concurrency: int, stock: int, flush_ms: float):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    coalescer = OrderCoalescer(flush_interval_ms=flush_ms)
+    await run_mode("row-lock", _row_lock, orders, concurrency, stock)
+    await run_mode("coalesced", coalescer.submit, orders, concurrency, stock)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--stock", type=int, default=2500)
+    parser.add_argument("--flush-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    engine.echo = False
+    asyncio.run(run(args.orders, args.concurrency, args.stock, args.flush_ms))
+
+
+if __name__ == "__main__":
+    main()
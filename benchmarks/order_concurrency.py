@@ -0,0 +1,92 @@
+"""
+Eşzamanlı sipariş benchmark'ı.
+
+Tek bir ürüne aynı anda çok sayıda sipariş gönderir; saniyedeki sipariş
+sayısını raporlar ve stoğun hiçbir zaman eksiye düşmediğini doğrular.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.order_concurrency --orders 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete, select
+
+from app.database import AsyncSessionLocal, Base, engine
+from app.models import Order, Product
+from app.repositories.order_repository import OrderRepository
+from app.schemas import OrderCreate
+
+
+async def _setup(stock: int) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        product = Product(name=f"bench-{uuid.uuid4().hex[:8]}", price=10, stock=stock, critical_stock=0)
+        db.add(product)
+        await db.commit()
+        return product.id
+
+
+async def _teardown(product_id: int):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Order).where(Order.product_id == product_id))
+        await db.execute(delete(Product).where(Product.id == product_id))
+        await db.commit()
+
+
+async def run(orders: int, concurrency: int, stock: int, quantity: int):
+    product_id = await _setup(stock)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(orders):
+        queue.put_nowait(OrderCreate(product_id=product_id, quantity=quantity))
+
+    placed = rejected = 0
+    min_seen_stock = stock
+
+    async def worker():
+        nonlocal placed, rejected, min_seen_stock
+        while not queue.empty():
+            order = queue.get_nowait()
+            async with AsyncSessionLocal() as db:
+                try:
+                    _, product = await OrderRepository(db).place(order)
+                    placed += 1
+                    min_seen_stock = min(min_seen_stock, product.stock)
+                except ValueError:
+                    rejected += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as db:
+        final_stock = await db.scalar(select(Product.stock).where(Product.id == product_id))
+    await _teardown(product_id)
+
+    print(f"orders attempted : {orders} (concurrency={concurrency})")
+    print(f"placed / rejected: {placed} / {rejected}")
+    print(f"elapsed          : {elapsed:.3f}s")
+    print(f"orders/sec       : {orders / elapsed:.1f}")
+    print(f"final stock      : {final_stock} (lowest observed {min_seen_stock})")
+
+    assert final_stock >= 0 and min_seen_stock >= 0, "stock went negative"
+    assert final_stock == stock - placed * quantity, "stock does not match placed orders"
+    assert placed == min(orders, stock // quantity), "orders were rejected while stock was available"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--stock", type=int, default=1000)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+
+    engine.echo = False
+    asyncio.run(run(args.orders, args.concurrency, args.stock, args.quantity))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+# app.database DATABASE_URL'i import anında okur; testler geçici bir SQLite dosyası kullanır
+_tmp_dir = tempfile.mkdtemp(prefix="stock-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ.setdefault("MODEL_STORE_DIR", os.path.join(_tmp_dir, "models"))
+os.environ.pop("REDIS_URL", None)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import AsyncSessionLocal, Base, engine
+from app.main import app
+from app.models import DailyProductSales, MaintenanceMarker
+from app.routers.auth import get_current_user
+from app.services.classification_service import classify_products, product_class_cache
+from app.services.fit_service import fit_service
+from app.services.product_cache import product_cache
+from app.services.response_cache import response_cache
+from app.services.sales_rollup_service import BACKFILL_MARKER, sales_rollup_state
+
+
+async def _reset_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    # Bağlantılar her testin kendi event loop'unda açılsın
+    await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def db():
+    """Her test boş bir şemayla ve boş cache'lerle başlar"""
+    asyncio.run(_reset_schema())
+    product_cache.clear(publish=False)
+    product_class_cache.clear()
+    response_cache.entries.clear()
+    sales_rollup_state.backfilled = False
+    yield
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fit_pool():
+    yield fit_service
+    fit_service.shutdown()
+
+
+@pytest.fixture
+def client():
+    # Startup event'leri (scheduler, arka plan task'ları) çalışmasın diye context manager kullanılmaz
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, email="tester@example.com")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def create_product(client):
+    def create(name: str, stock: int, price: int = 10, critical_stock: int = 0) -> dict:
+        response = client.post("/products/create/", json={
+            "name": name, "price": price, "stock": stock, "critical_stock": critical_stock
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+    return create
+
+
+@pytest.fixture
+def seed_sales():
+    """{product_id: [adet, ...]} geçmişini dünde bitecek şekilde daily_product_sales'e yazar ve backfill edilmiş sayar"""
+    def seed(history: dict):
+        async def write():
+            async with AsyncSessionLocal() as db:
+                for product_id, quantities in history.items():
+                    end = date.today() - timedelta(days=1)
+                    db.add_all(
+                        DailyProductSales(product_id=product_id, day=end - timedelta(days=i), qty=qty, revenue=qty * 10)
+                        for i, qty in enumerate(reversed(quantities)) if qty
+                    )
+                await db.merge(MaintenanceMarker(name=BACKFILL_MARKER))
+                await db.commit()
+        asyncio.run(write())
+    return seed
+
+
+@pytest.fixture
+def catalog(create_product, seed_sales):
+    """Farklı katmanlara düşen ürünler: A, B ve C sınıfı, kesikli talep ve satışsız"""
+    rng = random.Random(7)
+    ids = [create_product(f"product-{i}", stock=200)["id"] for i in range(8)]
+    seed_sales({
+        ids[0]: [rng.randint(80, 120) for _ in range(120)],
+        ids[1]: [rng.randint(5, 15) for _ in range(120)],
+        ids[2]: [rng.randint(4, 12) for _ in range(120)],
+        ids[3]: [rng.choice([0, 0, 0, 0, 3]) for _ in range(120)],
+        ids[4]: [rng.randint(0, 2) for _ in range(120)],
+        ids[5]: [rng.randint(0, 3) for _ in range(120)],
+        ids[6]: [rng.choice([0, 0, 0, 1]) for _ in range(120)],
+    })
+
+    async def classify():
+        async with AsyncSessionLocal() as db:
+            await classify_products(db)
+
+    asyncio.run(classify())
+    return ids
@@ -0,0 +1,19 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models import Order, Product
+
+
+async def _scalar(stmt):
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(stmt)).scalar_one()
+
+
+def product_stock(product_id: int) -> int:
+    return asyncio.run(_scalar(select(Product.stock).where(Product.id == product_id)))
+
+
+def order_count() -> int:
+    return asyncio.run(_scalar(select(func.count(Order.id))))
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.database import AsyncSessionLocal
+from app.services.batch_forecast_service import (
+    HOLDOUT_DAYS, HOLT_WINTERS, METHODS, MODELS, MOVING_AVERAGE, SEASONAL_NAIVE, SHORT_HISTORY,
+    forecast_matrix, forecast_products, load_sales_matrix, recommended_order_qty
+)
+
+
+def _sales_matrix(days: int = 120) -> np.ndarray:
+    rng = np.random.default_rng(3)
+    weekly = np.tile([2.0, 4, 6, 8, 10, 30, 40], days // 7 + 1)[:days]
+    return np.vstack([
+        weekly,
+        # Seviye kayması: yakın geçmişin ortalaması en iyisi
+        np.r_[rng.normal(5, 1, days - 24), rng.normal(25, 1, 24)],
+        np.linspace(1, 40, days) + rng.normal(0, 1, days),
+        rng.poisson(3, days).astype(float) * (rng.random(days) < 0.4),
+    ])
+
+
+def test_each_product_gets_the_model_with_the_lowest_holdout_mae():
+    Y = _sales_matrix()
+    forecast, model_idx = forecast_matrix(Y, 14)
+
+    train, test = Y[:, :-HOLDOUT_DAYS], Y[:, -HOLDOUT_DAYS:]
+    errors = np.stack([np.abs(method(train, HOLDOUT_DAYS) - test).mean(axis=1) for method in METHODS])
+    assert model_idx.tolist() == errors.argmin(axis=0).tolist()
+    assert [MODELS[i] for i in model_idx[:3]] == [SEASONAL_NAIVE, MOVING_AVERAGE, HOLT_WINTERS]
+    assert forecast.shape == (4, 14)
+    assert (forecast >= 0).all()
+
+
+def test_short_histories_use_the_recent_mean():
+    Y = np.zeros((2, 120))
+    Y[0, -10:] = 7
+    forecast, model_idx = forecast_matrix(Y, 5)
+
+    assert [MODELS[i] for i in model_idx] == [SHORT_HISTORY, SHORT_HISTORY]
+    assert forecast[0].tolist() == [7.0] * 5
+    assert forecast[1].tolist() == [0.0] * 5
+
+
+def test_recommended_order_quantities():
+    forecast = np.array([[5.0] * 30, [1.0] * 30])
+    stockout, recommended, target_days = recommended_order_qty(forecast, np.array([12.0, 100.0]), lead_time_days=7)
+
+    assert target_days == 14
+    assert stockout.tolist() == [2, -1]
+    assert recommended.tolist() == [58, 0]
+
+
+def test_forecast_products_reads_history_up_to_yesterday(create_product, seed_sales):
+    products = [create_product(f"product-{i}", stock=100) for i in range(3)]
+    Y = _sales_matrix(90)
+    seed_sales({product["id"]: Y[i].astype(int).tolist() for i, product in enumerate(products)})
+    rows = [(product["id"], product["name"], product["stock"]) for product in products]
+    end = date.today() - timedelta(days=1)
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            matrix = await load_sales_matrix(db, np.array([row[0] for row in rows]), end - timedelta(days=89), end)
+            batch = await forecast_products(db, rows, horizon_days=14, lead_time_days=7, history_days=90)
+        return matrix, batch
+
+    matrix, batch = asyncio.run(run())
+    results = list(batch.results(include_forecast=True))
+
+    assert matrix.tolist() == Y[:3].astype(int).astype(float).tolist()
+    assert batch.start == date.today()
+    assert [result["product_id"] for result in results] == [product["id"] for product in products]
+    assert results[0]["model"] == SEASONAL_NAIVE
+    assert results[0]["forecast"][0]["date"] == date.today().isoformat()
+    assert len(results[0]["forecast"]) == 14
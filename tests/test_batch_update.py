@@ -0,0 +1,37 @@
+from app.routers import products as products_router
+from app.routers.products import MAX_BATCH_UPDATES
+
+
+def test_batch_update_applies_patches_in_one_request(client, create_product, monkeypatch):
+    notified = []
+
+    async def notify(products):
+        notified.append(sorted(product.id for product in products))
+
+    monkeypatch.setattr(products_router, "notify_critical_stock_batch", notify)
+    widget = create_product("widget", stock=50, price=10, critical_stock=5)
+    gadget = create_product("gadget", stock=2, price=20, critical_stock=5)
+
+    response = client.put("/products/batch_update/", json=[
+        {"id": widget["id"], "stock": 40},
+        {"id": gadget["id"], "price": 25},
+        {"id": 999, "stock": 1},
+        # Aynı ürün için son yama geçerli olur
+        {"id": widget["id"], "stock": 3, "description": "almost gone"},
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["not_found"] == [999]
+    updated = {product["id"]: product for product in body["data"]}
+    assert (updated[widget["id"]]["stock"], updated[widget["id"]]["description"]) == (3, "almost gone")
+    assert (updated[gadget["id"]]["price"], updated[gadget["id"]]["stock"]) == (25, 2)
+    # Yalnızca kritik seviyeye yeni düşen ürün bildirilir
+    assert notified == [[widget["id"]]]
+    listed = {product["id"]: product for product in client.get("/products/list/").json()["data"]}
+    assert listed[widget["id"]]["stock"] == 3
+
+
+def test_batch_update_size_is_limited(client):
+    updates = [{"id": i, "stock": 1} for i in range(MAX_BATCH_UPDATES + 1)]
+    assert client.put("/products/batch_update/", json=updates).status_code == 413
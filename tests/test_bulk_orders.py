@@ -0,0 +1,46 @@
+from app.routers.orders import MAX_BULK_ORDERS
+from tests.helpers import order_count, product_stock
+
+
+def test_bulk_orders_report_each_line(client, create_product):
+    product = create_product("widget", stock=5)
+
+    response = client.post("/orders/bulk/", json=[
+        {"product_id": product["id"], "quantity": 3},
+        {"product_id": product["id"], "quantity": 3},
+        {"product_id": 999, "quantity": 1},
+        {"product_id": product["id"], "quantity": 2},
+    ])
+
+    assert response.status_code == 200
+    lines = response.json()
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert [line["success"] for line in lines] == [True, False, False, True]
+    assert lines[1]["error"] == "Insufficient stock"
+    assert lines[2]["error"] == "Product not found"
+    assert [lines[0]["order"]["quantity"], lines[3]["order"]["quantity"]] == [3, 2]
+    assert product_stock(product["id"]) == 0
+    assert order_count() == 2
+
+
+def test_bulk_orders_without_valid_lines_write_nothing(client, create_product):
+    product = create_product("widget", stock=1)
+
+    response = client.post("/orders/bulk/", json=[
+        {"product_id": product["id"], "quantity": 2},
+        {"product_id": 999, "quantity": 1},
+    ])
+
+    assert response.status_code == 200
+    assert [line["success"] for line in response.json()] == [False, False]
+    assert product_stock(product["id"]) == 1
+    assert order_count() == 0
+
+
+def test_bulk_orders_are_limited_per_request(client, create_product):
+    product = create_product("widget", stock=5)
+
+    assert client.post("/orders/bulk/", json=[]).json() == []
+    too_many = [{"product_id": product["id"], "quantity": 1}] * (MAX_BULK_ORDERS + 1)
+    assert client.post("/orders/bulk/", json=too_many).status_code == 413
+    assert order_count() == 0
@@ -0,0 +1,56 @@
+import asyncio
+
+from app.database import AsyncSessionLocal
+from app.services import forecast_service
+from app.services.batch_forecast_service import forecast_products
+from app.services.classification_service import (
+    INTERMITTENT_TIER, NAIVE_TIER, SARIMAX_TIER, SMOOTHING_TIER, model_tier, product_class_cache
+)
+
+
+async def _classes(product_ids):
+    async with AsyncSessionLocal() as db:
+        return await product_class_cache.get_many(db, product_ids)
+
+
+def test_products_are_classified_into_tiers(catalog):
+    classes = asyncio.run(_classes(catalog))
+    tiers = [model_tier(classes[product_id]) for product_id in catalog]
+
+    assert classes[catalog[0]]["abc"] == "A"
+    assert tiers[0] == SARIMAX_TIER
+    assert tiers[1] == tiers[2] == SMOOTHING_TIER
+    assert tiers[3] == INTERMITTENT_TIER
+    assert NAIVE_TIER in tiers[4:]
+    assert model_tier(None) == SMOOTHING_TIER
+
+
+def test_single_product_forecast_uses_the_tier_model(client, catalog):
+    models = {
+        product_id: client.get(f"/forecast/{product_id}", params={"horizon_days": 7}).json()["model"]
+        for product_id in catalog[:4]
+    }
+
+    assert models[catalog[0]].startswith("A") and ":sarimax" in models[catalog[0]]
+    assert "holt_winters" in models[catalog[1]]
+    assert models[catalog[3]].endswith(":croston_sba")
+
+
+def test_refit_sweep_refits_a_class_products(catalog, monkeypatch):
+    calls = []
+
+    async def fake_forecast(db, product_id, horizon_days, lead_time_days, refit=False):
+        calls.append((product_id, refit))
+        return {"product_id": product_id, "model": "sarimax"}
+
+    monkeypatch.setattr(forecast_service, "forecast_product_demand", fake_forecast)
+
+    async def sweep():
+        async with AsyncSessionLocal() as db:
+            return await forecast_products(db, [(pid, f"p{pid}", 100) for pid in catalog], 14, 7, refit=True)
+
+    batch = asyncio.run(sweep())
+    results = {result["product_id"]: result for result in batch.results()}
+
+    assert calls == [(catalog[0], True)]
+    assert results[catalog[0]]["model"] == "sarimax"
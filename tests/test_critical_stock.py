@@ -0,0 +1,33 @@
+import asyncio
+
+from sqlalchemy import text
+
+from app.database import engine
+
+
+async def _index_sql() -> str:
+    async with engine.connect() as conn:
+        return (await conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'ix_products_critical_stock'"
+        ))).scalar_one()
+
+
+def test_critical_stock_index_is_partial():
+    assert "WHERE stock <= critical_stock" in asyncio.run(_index_sql())
+
+
+def test_critical_stock_list_follows_stock_changes(client, create_product):
+    low = create_product("low", stock=1, critical_stock=5)
+    healthy = create_product("healthy", stock=50, critical_stock=5)
+
+    def critical_ids():
+        return [product["id"] for product in client.get("/products/critical_stock_list/").json()]
+
+    assert critical_ids() == [low["id"]]
+    assert client.get("/metrics/").json()["critical_stock_count"] == 1
+
+    client.post("/orders/create/", json={"product_id": healthy["id"], "quantity": 46})
+    client.put("/products/batch_update/", json=[{"id": low["id"], "stock": 30}])
+
+    assert critical_ids() == [healthy["id"]]
+    assert client.get("/metrics/").json()["critical_stock_count"] == 1
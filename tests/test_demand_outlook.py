@@ -0,0 +1,38 @@
+import asyncio
+from datetime import date, timedelta
+
+from app.services.demand_outlook_service import demand_outlook_service
+
+
+def test_outlook_is_unavailable_until_the_first_refresh(client, monkeypatch):
+    monkeypatch.setattr(demand_outlook_service, "latest", None)
+
+    assert client.get("/forecast/demand-forecast").status_code == 503
+
+
+def test_outlook_starts_today_and_filters_by_class(client, catalog, monkeypatch):
+    monkeypatch.setattr(demand_outlook_service, "latest", None)
+    outlook = asyncio.run(demand_outlook_service.refresh())
+
+    response = client.get("/forecast/demand-forecast", params={"horizon_days": 14})
+    assert response.status_code == 200
+    assert response.headers["X-Forecast-Computed-At"] == outlook.computed_at.isoformat()
+    total = response.json()
+    assert [row["date"] for row in total] == [(date.today() + timedelta(days=i)).isoformat() for i in range(14)]
+
+    # Sınıflara bölünmüş toplamlar katalog toplamını verir (yuvarlama farkı hariç)
+    by_abc = [
+        client.get("/forecast/demand-forecast", params={"horizon_days": 14, "abc": cls}).json()
+        for cls in ("A", "B", "C")
+    ]
+    for day, *parts in zip(total, *by_abc):
+        assert abs(day["predicted_demand"] - sum(p["predicted_demand"] for p in parts)) <= 3
+
+    # Her iki filtre birlikte uygulanır; olmayan bir grup sıfır talep döner
+    (abc, xyz), = [g for g in outlook.groups if g[0] == "A"]
+    assert outlook.select(14, [abc], [xyz]) == client.get(
+        "/forecast/demand-forecast", params={"horizon_days": 14, "abc": abc, "xyz": xyz}
+    ).json()
+    missing = next(x for x in ("X", "Y", "Z") if (abc, x) not in outlook.groups)
+    empty = client.get("/forecast/demand-forecast", params={"abc": abc, "xyz": missing}).json()
+    assert {row["predicted_demand"] for row in empty} == {0}
@@ -0,0 +1,48 @@
+import asyncio
+import csv
+import io
+import json
+
+from app.services.export_service import products_export_query, stream_export
+
+
+def test_product_export_streams_csv(client, create_product):
+    widget = create_product("widget", stock=1, price=10, critical_stock=5)
+    create_product("gadget, large", stock=50, price=20, critical_stock=5)
+
+    response = client.get("/products/export", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="products.csv"'
+    assert [row["name"] for row in rows] == ["widget", "gadget, large"]
+    assert rows[0]["stock"] == "1"
+
+    critical = client.get("/products/export", params={"format": "csv", "critical_only": True}).text
+    assert [row["id"] for row in csv.DictReader(io.StringIO(critical))] == [str(widget["id"])]
+
+
+def test_order_export_streams_ndjson_with_filters(client, create_product):
+    widget = create_product("widget", stock=10)
+    gadget = create_product("gadget", stock=10)
+    for product, quantity in ((widget, 1), (gadget, 2), (widget, 3)):
+        client.post("/orders/create/", json={"product_id": product["id"], "quantity": quantity})
+
+    response = client.get("/orders/export", params={"format": "ndjson", "product_id": widget["id"]})
+    orders = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [(order["product_id"], order["quantity"]) for order in orders] == [(widget["id"], 1), (widget["id"], 3)]
+    assert all("order_date" in order for order in orders)
+
+
+def test_export_is_produced_in_batches(create_product):
+    for i in range(5):
+        create_product(f"product-{i}", stock=i)
+
+    async def collect():
+        return [chunk async for chunk in stream_export(products_export_query(), "ndjson", batch_size=2)]
+
+    chunks = asyncio.run(collect())
+
+    assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
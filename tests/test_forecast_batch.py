@@ -0,0 +1,30 @@
+import json
+
+from app.services import forecast_service
+from app.services.forecast_cache import ForecastCache
+
+
+def _fresh_forecast_cache(monkeypatch):
+    monkeypatch.setattr(forecast_service, "forecast_cache", ForecastCache())
+
+
+def test_batch_results_match_single_product_endpoint(client, catalog, monkeypatch):
+    # SARIMAX ürünü (ilk ürün, A sınıfı) warm-start'a bağlı olduğundan karşılaştırmaya alınmaz
+    product_ids = catalog[1:]
+    _fresh_forecast_cache(monkeypatch)
+    response = client.post("/forecast/batch", json={"product_ids": product_ids, "horizon_days": 14})
+    streamed = {line["product_id"]: line for line in map(json.loads, response.text.splitlines())}
+
+    assert sorted(streamed) == sorted(product_ids)
+    for product_id in product_ids:
+        _fresh_forecast_cache(monkeypatch)
+        single = client.get(f"/forecast/{product_id}", params={"horizon_days": 14}).json()
+        assert streamed[product_id] == single
+
+
+def test_batch_reports_unknown_products(client, catalog):
+    response = client.post("/forecast/batch", json={"product_ids": [catalog[1], 999], "horizon_days": 7})
+    lines = {line["product_id"]: line for line in map(json.loads, response.text.splitlines())}
+
+    assert lines[999] == {"product_id": 999, "error": "Product not found"}
+    assert "forecast" in lines[catalog[1]]
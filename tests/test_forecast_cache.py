@@ -0,0 +1,113 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.models import DailyProductSales
+from app.services import forecast_service
+from app.services.forecast_cache import ForecastCache
+
+
+class SlowCompute:
+    def __init__(self, value="result", delay: float = 0.05):
+        self.value, self.delay = value, delay
+        self.calls = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.value
+
+
+def test_concurrent_requests_share_one_computation():
+    cache, compute = ForecastCache(), SlowCompute()
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.run("p1", compute) for _ in range(5)))
+        cached = await cache.run("p1", compute)
+        return results, cached
+
+    results, cached = asyncio.run(scenario())
+
+    assert results == ["result"] * 5
+    assert cached == "result"
+    assert compute.calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_refresh_does_not_join_a_cached_computation():
+    cache, compute, refresh = ForecastCache(), SlowCompute("stale"), SlowCompute("fresh")
+
+    async def scenario():
+        return await asyncio.gather(cache.run("p1", compute), cache.run("p1", refresh, refresh=True))
+
+    assert asyncio.run(scenario()) == ["stale", "fresh"]
+    assert compute.calls == refresh.calls == 1
+
+
+def test_uncacheable_results_are_not_stored():
+    cache, compute = ForecastCache(), SlowCompute("fallback", delay=0)
+
+    async def scenario():
+        for _ in range(2):
+            await cache.run("p1", compute, cacheable=lambda result: result != "fallback")
+
+    asyncio.run(scenario())
+
+    assert compute.calls == 2
+
+
+def test_computation_is_cancelled_when_all_waiters_leave():
+    cache, compute = ForecastCache(), SlowCompute(delay=10)
+
+    async def scenario():
+        waiters = [asyncio.ensure_future(cache.run("p1", compute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+        await asyncio.sleep(0.01)
+        # Bir bekleyen kaldığı sürece hesaplama sürer
+        assert not compute.cancelled
+        waiters[1].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiters[1]
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+
+    assert compute.cancelled
+    assert compute.calls == 1
+
+
+async def _record_sale_today(product_id: int):
+    # Stok değişmeden yalnızca satış watermark'ı ilerler
+    async with AsyncSessionLocal() as db:
+        db.add(DailyProductSales(product_id=product_id, day=date.today(), qty=1, revenue=10))
+        await db.commit()
+
+
+def test_forecasts_are_recomputed_when_the_sales_watermark_moves(client, catalog, monkeypatch):
+    product_id = catalog[1]
+    monkeypatch.setattr(forecast_service, "forecast_cache", ForecastCache())
+    builds = []
+    build = forecast_service._build_forecast
+
+    async def counting_build(*args):
+        builds.append(args[0])
+        return await build(*args)
+
+    monkeypatch.setattr(forecast_service, "_build_forecast", counting_build)
+
+    first = client.get(f"/forecast/{product_id}", params={"horizon_days": 7}).json()
+    cached = client.get(f"/forecast/{product_id}", params={"horizon_days": 7}).json()
+    asyncio.run(_record_sale_today(product_id))
+    after_sale = client.get(f"/forecast/{product_id}", params={"horizon_days": 7}).json()
+
+    assert cached == first
+    assert builds == [product_id, product_id]
+    assert after_sale["current_stock"] == first["current_stock"]
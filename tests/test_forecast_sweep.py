@@ -0,0 +1,89 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models import ForecastSweepItem
+from app.services import forecast_sweep_service
+from app.services.forecast_sweep_service import prioritized_products, run_forecast_sweep
+
+
+class FakeBatch:
+    def __init__(self, rows):
+        self.rows = rows
+        self.fit_seconds = [0.001]
+
+    def results(self):
+        return ({"product_id": row[0]} for row in self.rows)
+
+
+def _fake_forecasts(monkeypatch, fail_on: set = frozenset()):
+    """forecast_products yerine geçer; aldığı ürünleri kaydeder, fail_on'daki ürünlerin chunk'ını düşürür"""
+    seen = []
+
+    async def forecast_products(db, rows, horizon_days, lead_time_days, refit=False):
+        if fail_on.intersection(row[0] for row in rows):
+            raise RuntimeError("fit pool is gone")
+        seen.extend(row[0] for row in rows)
+        return FakeBatch(rows)
+
+    monkeypatch.setattr(forecast_sweep_service, "forecast_products", forecast_products)
+    return seen
+
+
+def _sweep(**kwargs):
+    return asyncio.run(run_forecast_sweep("test", chunk_size=2, concurrency=1, **kwargs))
+
+
+async def _checkpoint_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(ForecastSweepItem))).scalar_one()
+
+
+def test_products_are_prioritized_by_days_of_cover(create_product, seed_sales):
+    slow = create_product("slow", stock=100)["id"]
+    fast = create_product("fast", stock=100)["id"]
+    unsold = create_product("unsold", stock=1)["id"]
+    seed_sales({slow: [1] * 28, fast: [10] * 28})
+
+    async def order():
+        async with AsyncSessionLocal() as db:
+            return [row[0] for row in await prioritized_products(db)]
+
+    assert asyncio.run(order()) == [fast, slow, unsold]
+
+
+def test_failed_chunks_are_resumed_from_the_checkpoint(create_product, monkeypatch):
+    ids = [create_product(f"product-{i}", stock=10)["id"] for i in range(5)]
+
+    seen = _fake_forecasts(monkeypatch, fail_on={ids[2]})
+    first = _sweep()
+    assert (first.status, first.processed, first.failed, first.total) == ("incomplete", 3, 2, 5)
+    assert asyncio.run(_checkpoint_count()) == 3
+
+    seen = _fake_forecasts(monkeypatch)
+    results = []
+
+    async def on_result(result):
+        results.append(result["product_id"])
+
+    second = _sweep(on_result=on_result)
+
+    assert second.id == first.id
+    assert sorted(seen) == sorted(results) == [ids[2], ids[3]]
+    assert (second.status, second.processed, second.failed) == ("completed", 5, 0)
+    assert asyncio.run(_checkpoint_count()) == 0
+
+
+def test_sweep_stops_starting_chunks_when_the_budget_is_spent(create_product, monkeypatch):
+    for i in range(4):
+        create_product(f"product-{i}", stock=10)
+    seen = _fake_forecasts(monkeypatch)
+
+    exhausted = _sweep(budget_seconds=0)
+    assert (exhausted.status, exhausted.processed, exhausted.skipped) == ("budget_exhausted", 0, 4)
+    assert seen == []
+
+    resumed = _sweep()
+    assert (resumed.id, resumed.status, resumed.processed) == (exhausted.id, "completed", 4)
+    assert len(seen) == 4
@@ -0,0 +1,67 @@
+import asyncio
+import uuid
+
+from app.services.idempotency_service import IdempotencyStore
+from tests.helpers import order_count, product_stock
+
+
+def test_idempotent_order_is_replayed(client, create_product):
+    product = create_product("widget", stock=5)
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    body = {"product_id": product["id"], "quantity": 2}
+
+    first = client.post("/orders/create/", json=body, headers=headers)
+    replay = client.post("/orders/create/", json=body, headers=headers)
+
+    assert first.status_code == replay.status_code == 200
+    assert replay.json() == first.json()
+    assert order_count() == 1
+    assert product_stock(product["id"]) == 3
+
+
+def test_idempotency_key_reused_with_different_body_is_rejected(client, create_product):
+    product = create_product("widget", stock=5)
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+    first = client.post("/orders/create/", json={"product_id": product["id"], "quantity": 2}, headers=headers)
+    mismatch = client.post("/orders/create/", json={"product_id": product["id"], "quantity": 1}, headers=headers)
+
+    assert first.status_code == 200
+    assert mismatch.status_code == 422
+    assert order_count() == 1
+
+
+def test_concurrent_requests_with_the_same_key_run_once():
+    store, calls = IdempotencyStore(), []
+
+    async def place():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"order_id": len(calls)}
+
+    async def scenario():
+        return await asyncio.gather(*(store.run("user:key", place) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [{"order_id": 1}] * 5
+    assert len(calls) == 1
+    assert store.stats()["coalesced"] == 4
+
+
+def test_failed_requests_are_not_stored():
+    store, calls = IdempotencyStore(), []
+
+    async def place():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("Insufficient stock")
+        return {"order_id": 1}
+
+    async def scenario():
+        try:
+            await store.run("user:key", place)
+        except ValueError:
+            pass
+        return await store.run("user:key", place)
+
+    assert asyncio.run(scenario()) == {"order_id": 1}
+    assert len(calls) == 2
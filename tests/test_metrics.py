@@ -0,0 +1,58 @@
+import asyncio
+
+from sqlalchemy import delete
+
+from app.database import AsyncSessionLocal
+from app.models import MetricCounter
+from app.services.metrics_service import (
+    COUNTER_SHARDS, ORDERS_COUNT, ORDERS_QUANTITY, ORDERS_REVENUE, read_counters, reconcile_counters
+)
+
+
+async def _counters() -> dict:
+    async with AsyncSessionLocal() as db:
+        return await read_counters(db)
+
+
+async def _tamper():
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(MetricCounter).where(MetricCounter.name == ORDERS_COUNT))
+        # Normalde kullanılmayan bir shard'a fazladan adet yazılır
+        db.add(MetricCounter(name=ORDERS_QUANTITY, shard=COUNTER_SHARDS, value=7))
+        await db.commit()
+
+
+def test_counters_follow_orders(client, create_product):
+    product = create_product("widget", stock=10, price=5)
+    client.post("/orders/create/", json={"product_id": product["id"], "quantity": 2})
+    client.post("/orders/bulk/", json=[{"product_id": product["id"], "quantity": 3}] * 2)
+
+    assert asyncio.run(_counters()) == {ORDERS_COUNT: 3, ORDERS_QUANTITY: 8, ORDERS_REVENUE: 40}
+    assert asyncio.run(reconcile_counters()) == {ORDERS_COUNT: 0, ORDERS_QUANTITY: 0, ORDERS_REVENUE: 0}
+
+
+def test_reconcile_corrects_drifted_counters(client, create_product):
+    product = create_product("widget", stock=10, price=5)
+    for quantity in (1, 2, 3):
+        client.post("/orders/create/", json={"product_id": product["id"], "quantity": quantity})
+    asyncio.run(_tamper())
+
+    drift = asyncio.run(reconcile_counters())
+
+    assert drift[ORDERS_COUNT] == 3
+    assert drift[ORDERS_QUANTITY] == -7
+    assert drift[ORDERS_REVENUE] == 0
+    assert asyncio.run(_counters()) == {ORDERS_COUNT: 3, ORDERS_QUANTITY: 6, ORDERS_REVENUE: 30}
+    assert asyncio.run(reconcile_counters()) == {ORDERS_COUNT: 0, ORDERS_QUANTITY: 0, ORDERS_REVENUE: 0}
+
+
+def test_dashboard_reads_totals_from_counters(client, create_product):
+    product = create_product("widget", stock=10, price=5, critical_stock=8)
+    client.post("/orders/create/", json={"product_id": product["id"], "quantity": 3})
+
+    metrics = client.get("/metrics/").json()
+
+    assert metrics["total_orders"] == 3
+    assert metrics["total_orders_revenue"] == 15
+    assert metrics["total_products_count"] == 1
+    assert metrics["critical_stock_count"] == 1
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app.services import forecast_service
+from app.services.model_store import ModelStore
+
+
+def test_models_are_persisted_and_shared_through_disk(tmp_path):
+    writer, reader = ModelStore(str(tmp_path)), ModelStore(str(tmp_path))
+
+    async def scenario():
+        await writer.put(1, "spec", np.array([0.1, 0.2]), date(2024, 1, 1), 100)
+        first = await reader.get(1, "spec")
+        # Başka bir worker'ın (ör. gece işi) sonradan yazdığı model okunur
+        await writer.put(1, "spec", np.array([0.3, 0.4]), date(2024, 1, 2), 101)
+        os.utime(writer._path(1, "spec"), (time.time() + 5, time.time() + 5))
+        second = await reader.get(1, "spec")
+        return first, second, await reader.get(1, "other-spec")
+
+    first, second, missing = asyncio.run(scenario())
+
+    assert first["params"].tolist() == [0.1, 0.2]
+    assert (second["params"].tolist(), second["watermark"], second["nobs"]) == ([0.3, 0.4], date(2024, 1, 2), 101)
+    assert missing is None
+
+
+def test_sarimax_is_fitted_once_then_filtered_and_refits_warm_start(tmp_path, monkeypatch):
+    calls = []
+
+    async def run_inline(func, *args, timeout=None):
+        calls.append((func.__name__, args[2] if func.__name__ == "_sarimax_fit" else None))
+        return func(*args)
+
+    monkeypatch.setattr(forecast_service.fit_service, "run", run_inline)
+    monkeypatch.setattr(forecast_service, "model_store", ModelStore(str(tmp_path)))
+    rng = np.random.default_rng(5)
+    values = np.tile([10.0, 12, 14, 16, 18, 30, 35], 10) + rng.normal(0, 1, 70)
+    series = pd.Series(values, index=pd.date_range("2024-01-01", periods=70, freq="D"))
+
+    async def scenario():
+        await forecast_service._sarimax_forecast(1, series, 7, refit=False)
+        stored = await forecast_service.model_store.get(1, forecast_service.SARIMAX_SPEC)
+        await forecast_service._sarimax_forecast(1, series, 7, refit=False)
+        await forecast_service._sarimax_forecast(1, series, 7, refit=True)
+        return stored
+
+    stored = asyncio.run(scenario())
+
+    assert [name for name, _ in calls] == ["_sarimax_fit", "_sarimax_apply", "_sarimax_fit"]
+    assert calls[0][1] is None
+    # Refit, kayıtlı parametrelerden başlar
+    assert np.array_equal(calls[2][1], stored["params"])
+    assert stored["watermark"] == series.index[-1].date()
@@ -0,0 +1,44 @@
+import asyncio
+
+from app.schemas import OrderCreate
+from app.services import order_coalescer as order_coalescer_module
+from app.services.order_coalescer import OrderCoalescer
+from tests.helpers import product_stock
+
+
+def _submit_many(coalescer: OrderCoalescer, product_id: int, count: int):
+    async def scenario():
+        results = await asyncio.gather(
+            *(coalescer.submit(OrderCreate(product_id=product_id, quantity=1)) for _ in range(count)),
+            return_exceptions=True
+        )
+        await asyncio.sleep(0)
+        return results
+
+    return asyncio.run(scenario())
+
+
+# SQLite FOR UPDATE'i yok saydığı için her senaryo tek bir flush'la sınırlanır;
+# eşzamanlı flush'lar PostgreSQL'de satır kilidiyle sıralanır
+def test_full_batch_is_flushed_without_overselling(create_product):
+    product = create_product("hot", stock=5)
+    coalescer = OrderCoalescer(hot_product_ids=[product["id"]], flush_interval_ms=1000, max_batch_size=7)
+
+    results = _submit_many(coalescer, product["id"], 7)
+
+    assert sum(not isinstance(result, Exception) for result in results) == 5
+    assert [str(result) for result in results if isinstance(result, Exception)] == ["Insufficient stock"] * 2
+    assert product_stock(product["id"]) == 0
+    assert not order_coalescer_module._flush_tasks
+
+
+def test_pending_orders_are_flushed_after_the_interval(create_product):
+    product = create_product("hot", stock=5)
+    coalescer = OrderCoalescer(hot_product_ids=[product["id"]], flush_interval_ms=5, max_batch_size=100)
+
+    results = _submit_many(coalescer, product["id"], 3)
+
+    assert all(not isinstance(result, Exception) for result in results)
+    assert len({order.id for order, _ in results}) == 3
+    assert product_stock(product["id"]) == 2
+    assert not order_coalescer_module._flush_tasks
@@ -0,0 +1,40 @@
+import asyncio
+
+from app.database import AsyncSessionLocal
+from app.repositories.order_repository import OrderRepository
+from app.schemas import OrderCreate
+from tests.helpers import order_count, product_stock
+
+
+
+def test_order_rejects_oversell(client, create_product):
+    product = create_product("widget", stock=5)
+
+    first = client.post("/orders/create/", json={"product_id": product["id"], "quantity": 3})
+    second = client.post("/orders/create/", json={"product_id": product["id"], "quantity": 3})
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert second.json()["detail"] == "Insufficient stock"
+    assert product_stock(product["id"]) == 2
+
+
+def test_concurrent_orders_cannot_oversell(create_product):
+    product = create_product("widget", stock=5)
+
+    async def place():
+        async with AsyncSessionLocal() as db:
+            try:
+                await OrderRepository(db).place(OrderCreate(product_id=product["id"], quantity=1))
+                return True
+            except ValueError:
+                return False
+
+    async def place_many():
+        return await asyncio.gather(*(place() for _ in range(12)))
+
+    results = asyncio.run(place_many())
+
+    assert results.count(True) == 5
+    assert product_stock(product["id"]) == 0
+    assert order_count() == 5
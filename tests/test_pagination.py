@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.database import AsyncSessionLocal
+from app.models import Order
+
+
+def _product_pages(client, limit: int):
+    cursor = None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/products/list/", params=params).json()
+        yield [product["id"] for product in page["data"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return
+
+
+def test_product_cursor_paging_is_stable_under_inserts_and_deletes(client, create_product):
+    ids = [create_product(f"product-{i}", stock=50)["id"] for i in range(25)]
+    pages = _product_pages(client, limit=10)
+
+    seen = next(pages)
+    # Sayfalar arasında görülmüş bir ürün güncellenir ve yeni ürün eklenir
+    client.put(f"/products/update/{seen[0]}", json={"stock": 1})
+    extra = create_product("late-product", stock=50)["id"]
+    for page in pages:
+        seen += page
+
+    assert seen == ids + [extra]
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/products/list/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/orders/list/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+async def _same_order_date():
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Order).values(order_date=datetime(2024, 1, 1)))
+        await db.commit()
+
+
+def test_order_cursor_paging_breaks_date_ties_by_id(client, create_product):
+    product = create_product("widget", stock=100)
+    client.post("/orders/bulk/", json=[{"product_id": product["id"], "quantity": 1}] * 7)
+    asyncio.run(_same_order_date())
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/orders/list/", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        seen += [order["id"] for order in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        # Sayfalar arasında gelen yeni sipariş önceki sayfaları kaydırmaz
+        client.post("/orders/create/", json={"product_id": product["id"], "quantity": 1})
+
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_critical_stock_cursor_paging_returns_each_product_once(client, create_product):
+    critical = [create_product(f"low-{i}", stock=1, critical_stock=5)["id"] for i in range(5)]
+    create_product("healthy", stock=50, critical_stock=5)
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/products/critical_stock_list/", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        seen += [product["id"] for product in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == critical
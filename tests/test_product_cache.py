@@ -0,0 +1,41 @@
+import asyncio
+import logging
+
+from app.services import product_cache as product_cache_module
+from app.services.product_cache import ProductCache
+
+
+class FailingRedis:
+    async def publish(self, channel, message):
+        raise ConnectionError("redis is down")
+
+
+def test_invalidation_publish_tasks_are_tracked_and_failures_logged(monkeypatch, caplog):
+    async def get_redis():
+        return FailingRedis()
+
+    monkeypatch.setattr(product_cache_module, "REDIS_URL", "redis://test")
+    monkeypatch.setattr(product_cache_module, "get_redis", get_redis)
+    cache = ProductCache()
+
+    async def scenario():
+        cache.invalidate(1, 2)
+        cache.invalidate_counts()
+        pending = len(product_cache_module._publish_tasks)
+        await asyncio.sleep(0.01)
+        return pending
+
+    with caplog.at_level(logging.ERROR):
+        assert asyncio.run(scenario()) == 2
+
+    assert not product_cache_module._publish_tasks
+    assert caplog.text.count("invalidation publish failed") == 2
+
+
+def test_product_reads_are_served_from_cache_until_updated(client, create_product):
+    product = create_product("widget", stock=5)
+    assert client.get("/products/list/").json()["data"][0]["stock"] == 5
+
+    client.put(f"/products/update/{product['id']}", json={"stock": 8})
+
+    assert client.get("/products/list/").json()["data"][0]["stock"] == 8
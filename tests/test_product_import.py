@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import Product
+from app.services.product_import_service import import_products
+
+CSV = (
+    "name,description,price,stock,critical_stock\n"
+    "widget,first,10,5,2\n"
+    "gadget,,20,7,\n"
+    "broken,,not-a-price,1,1\n"
+    "widget,updated,12,9,3\n"
+)
+
+
+async def _products() -> dict:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(Product.name, Product.price, Product.stock, Product.description))).all()
+    return {name: (price, stock, description) for name, price, stock, description in rows}
+
+
+def _import(client, content: str, filename: str, **params):
+    return client.post("/products/import/", params=params, files={"file": (filename, content.encode())})
+
+
+def test_csv_import_upserts_by_name_and_reports_rejections(client, create_product):
+    create_product("gadget", stock=1, price=99)
+
+    response = _import(client, CSV, "catalog.csv", chunk_size=2)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["rows_read"] == 4
+    assert report["rows_valid"] == 3
+    assert report["rows_rejected"] == 1
+    assert report["rejected"][0]["line"] == 4
+    # Aynı isim dosyada iki kez geçerse son satır kazanır
+    assert asyncio.run(_products()) == {"widget": (12, 9, "updated"), "gadget": (20, 7, None)}
+
+
+def test_ndjson_import_rejects_malformed_lines(client):
+    lines = [json.dumps({"name": "widget", "price": 10, "stock": 5}), "{not json", json.dumps([1, 2])]
+
+    report = _import(client, "\n".join(lines) + "\n", "catalog.ndjson").json()
+
+    assert (report["rows_valid"], report["rows_rejected"]) == (1, 2)
+    assert asyncio.run(_products()) == {"widget": (10, 5, None)}
+
+
+def test_import_chunk_size_is_bounded(client):
+    assert _import(client, CSV, "catalog.csv", chunk_size=0).status_code == 422
+    assert _import(client, CSV, "catalog.csv", chunk_size=100000).status_code == 422
+
+
+def test_import_service_clamps_chunk_size():
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await import_products(db, CSV.splitlines(keepends=True), "csv", chunk_size=0)
+
+    assert asyncio.run(run()).rows_merged == 3
@@ -0,0 +1,102 @@
+import asyncio
+
+from starlette.requests import Request
+
+from app.services import response_cache as response_cache_module
+from app.services.response_cache import PRODUCTS, ResponseCache, response_cache
+
+
+def test_matching_etag_returns_304_without_rebuilding(client, create_product, monkeypatch):
+    create_product("widget", stock=5)
+    first = client.get("/products/list/")
+    etag = first.headers["etag"]
+
+    def fail_build(*args, **kwargs):
+        raise AssertionError("304 must not query the database")
+
+    monkeypatch.setattr("app.routers.products.ProductRepository", fail_build)
+    not_modified = client.get("/products/list/", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert response_cache.stats()["not_modified"] >= 1
+
+
+def test_writes_change_the_etag(client, create_product):
+    product = create_product("widget", stock=5)
+    etag = client.get("/products/list/").headers["etag"]
+
+    client.post("/orders/create/", json={"product_id": product["id"], "quantity": 1})
+    refreshed = client.get("/products/list/", headers={"If-None-Match": etag})
+
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert refreshed.json()["data"][0]["stock"] == 4
+
+
+def test_etag_depends_on_the_query(client, create_product):
+    for i in range(3):
+        create_product(f"product-{i}", stock=5)
+
+    etag = client.get("/products/list/", params={"limit": 2}).headers["etag"]
+    other_page = client.get("/products/list/", params={"limit": 1}, headers={"If-None-Match": etag})
+
+    assert other_page.status_code == 200
+    assert len(other_page.json()["data"]) == 1
+
+
+def test_critical_stock_list_keeps_cursor_header_on_304(client, create_product):
+    for i in range(3):
+        create_product(f"low-{i}", stock=1, critical_stock=5)
+
+    first = client.get("/products/critical_stock_list/", params={"limit": 2})
+    again = client.get("/products/critical_stock_list/", params={"limit": 2},
+                       headers={"If-None-Match": first.headers["etag"]})
+
+    assert again.status_code == 304
+    assert again.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, nx=False):
+        if not (nx and key in self.values):
+            self.values[key] = value
+
+
+def test_workers_share_etags_through_redis(monkeypatch):
+    fake = FakeRedis()
+
+    async def get_redis():
+        return fake
+
+    monkeypatch.setattr(response_cache_module, "get_redis", get_redis)
+    workers = [ResponseCache(use_redis=True), ResponseCache(use_redis=True)]
+    request = Request({"type": "http", "method": "GET", "path": "/products/list/", "query_string": b"", "headers": []})
+
+    async def build():
+        return {"data": []}, {}
+
+    async def etags():
+        return [(await worker.respond(request, [PRODUCTS], build)).headers["etag"] for worker in workers]
+
+    async def scenario():
+        before = await etags()
+        workers[0].bump(PRODUCTS)
+        after = await etags()
+        return before, after
+
+    before, after = asyncio.run(scenario())
+
+    assert before[0] == before[1]
+    assert after[0] == after[1] != before[0]
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+
+from app.database import AsyncSessionLocal
+from app.models import DailyProductSales, Order
+from app.services.forecast_service import fetch_daily_sales, fetch_daily_sales_many
+from app.services.sales_rollup_service import backfill_daily_sales, sales_rollup_state
+
+
+def _order(client, product_id: int, quantity: int):
+    assert client.post("/orders/create/", json={"product_id": product_id, "quantity": quantity}).status_code == 200
+
+
+async def _age_orders(days: int):
+    """Mevcut siparişleri geçmişe taşır ve özetlerini siler (deploy öncesi siparişler gibi)"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Order).values(order_date=datetime.utcnow() - timedelta(days=days)))
+        await db.execute(delete(DailyProductSales))
+        await db.commit()
+
+
+async def _rollup(product_id: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(DailyProductSales.day, DailyProductSales.qty).where(DailyProductSales.product_id == product_id)
+        )).all()
+    return {day: qty for day, qty in rows}
+
+
+async def _series(product_id: int):
+    async with AsyncSessionLocal() as db:
+        single = await fetch_daily_sales(db, product_id)
+        many, _ = await fetch_daily_sales_many(db, [product_id])
+    return single, many[product_id]
+
+
+def test_orders_are_rolled_up_per_day(client, create_product):
+    product = create_product("widget", stock=20, price=5)
+    _order(client, product["id"], 2)
+    client.post("/orders/bulk/", json=[{"product_id": product["id"], "quantity": 3}] * 2)
+
+    assert asyncio.run(_rollup(product["id"])) == {datetime.utcnow().date(): 8}
+
+
+def test_history_before_backfill_includes_orders_older_than_the_rollup(client, create_product):
+    product = create_product("widget", stock=20)
+    _order(client, product["id"], 2)
+    _order(client, product["id"], 3)
+    asyncio.run(_age_orders(10))
+    _order(client, product["id"], 1)
+
+    single, many = asyncio.run(_series(product["id"]))
+
+    assert single.sum() == many.sum() == 6
+    assert len(single) == 11
+
+
+def test_backfill_keeps_todays_concurrent_increments(client, create_product):
+    product = create_product("widget", stock=20)
+    _order(client, product["id"], 4)
+    asyncio.run(_age_orders(3))
+    _order(client, product["id"], 1)
+
+    async def concurrent_increment_then_backfill():
+        async with AsyncSessionLocal() as db:
+            # Backfill'in göremediği, eşzamanlı commit edilmiş bir siparişin artışı
+            await db.execute(update(DailyProductSales).values(qty=DailyProductSales.qty + 2))
+            await db.commit()
+            await backfill_daily_sales(db)
+
+    asyncio.run(concurrent_increment_then_backfill())
+    today = datetime.utcnow().date()
+
+    assert asyncio.run(_rollup(product["id"])) == {today - timedelta(days=3): 4, today: 3}
+    assert sales_rollup_state.backfilled
+    single, _ = asyncio.run(_series(product["id"]))
+    assert single.sum() == 7